@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Autonomous System - SQLite Helpers
+Shared connection setup for metrics and workspace databases.
+"""
+
+import functools
+import sqlite3
+import urllib.parse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple, Union
+
+
+# Connection options for local_vault.db checks: memory-mapped reads and a
+# small page cache, but no WAL since snapshots copy the vault as one file
+VAULT_DB_OPTIONS = {
+    "wal": False,
+    "cache_size": -8000,
+    "mmap_size": 268435456,
+}
+
+# Read tuning for metrics.db connections that scan execution_metrics. Both
+# PRAGMAs are per connection, so every such open passes them again
+METRICS_DB_OPTIONS = {
+    "cache_size": -20000,
+    "mmap_size": 268435456,
+}
+
+# Rollback audit trail in metrics.db (not the vault, which rollbacks restore)
+ROLLBACK_EVENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS rollback_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        snapshot_id TEXT,
+        reason TEXT,
+        success BOOLEAN NOT NULL,
+        task_id TEXT,
+        task_type TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Covering index for the dashboard aggregations over a created_at window.
+# created_at holds local-time ISO-8601 text, which sorts chronologically, so
+# "created_at > ?" is already an index range seek. Wrapping the column in
+# strftime('%s', ...) would need an expression index, lose the covering scan
+# and read the naive local timestamps as UTC.
+METRICS_INDEXES = {
+    "idx_execution_covering": """
+        CREATE INDEX IF NOT EXISTS idx_execution_covering
+        ON execution_metrics(created_at, status, risk_level, sandbox_score, execution_time_seconds)
+    """,
+}
+
+# Hourly rollup of execution_metrics, maintained by triggers, so dashboard
+# windows read ~one row per (hour, status, risk_level) instead of every task.
+# Buckets are the 'YYYY-MM-DDTHH' prefix of the ISO created_at text.
+METRICS_ROLLUP_SCRIPT = """
+    BEGIN IMMEDIATE;
+
+    CREATE TABLE IF NOT EXISTS hourly_metrics (
+        bucket TEXT NOT NULL,
+        status TEXT NOT NULL,
+        risk_level TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        exec_time_count INTEGER NOT NULL DEFAULT 0,
+        sum_exec_time REAL NOT NULL DEFAULT 0,
+        sandbox_count INTEGER NOT NULL DEFAULT 0,
+        sum_sandbox_score INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (bucket, status, risk_level)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS trg_hourly_metrics_insert
+    AFTER INSERT ON execution_metrics
+    BEGIN
+        INSERT INTO hourly_metrics (
+            bucket, status, risk_level, count,
+            exec_time_count, sum_exec_time, sandbox_count, sum_sandbox_score
+        ) VALUES (
+            substr(NEW.created_at, 1, 13), NEW.status, NEW.risk_level, 1,
+            NEW.execution_time_seconds IS NOT NULL, COALESCE(NEW.execution_time_seconds, 0),
+            NEW.sandbox_score IS NOT NULL, COALESCE(NEW.sandbox_score, 0)
+        )
+        ON CONFLICT (bucket, status, risk_level) DO UPDATE SET
+            count = count + 1,
+            exec_time_count = exec_time_count + excluded.exec_time_count,
+            sum_exec_time = sum_exec_time + excluded.sum_exec_time,
+            sandbox_count = sandbox_count + excluded.sandbox_count,
+            sum_sandbox_score = sum_sandbox_score + excluded.sum_sandbox_score;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_hourly_metrics_delete
+    AFTER DELETE ON execution_metrics
+    BEGIN
+        UPDATE hourly_metrics SET
+            count = count - 1,
+            exec_time_count = exec_time_count - (OLD.execution_time_seconds IS NOT NULL),
+            sum_exec_time = sum_exec_time - COALESCE(OLD.execution_time_seconds, 0),
+            sandbox_count = sandbox_count - (OLD.sandbox_score IS NOT NULL),
+            sum_sandbox_score = sum_sandbox_score - COALESCE(OLD.sandbox_score, 0)
+        WHERE bucket = substr(OLD.created_at, 1, 13)
+          AND status = OLD.status
+          AND risk_level = OLD.risk_level;
+    END;
+
+    -- Backfill rows written before the triggers existed
+    INSERT INTO hourly_metrics (
+        bucket, status, risk_level, count,
+        exec_time_count, sum_exec_time, sandbox_count, sum_sandbox_score
+    )
+    SELECT
+        substr(created_at, 1, 13), status, risk_level, COUNT(*),
+        COUNT(execution_time_seconds), COALESCE(SUM(execution_time_seconds), 0),
+        COUNT(sandbox_score), COALESCE(SUM(sandbox_score), 0)
+    FROM execution_metrics
+    WHERE NOT EXISTS (SELECT 1 FROM hourly_metrics)
+    GROUP BY 1, 2, 3;
+
+    COMMIT;
+"""
+
+
+def open_db(
+    path: Union[str, Path],
+    wal: bool = True,
+    cache_size: Optional[int] = None,
+    mmap_size: Optional[int] = None,
+    readonly: bool = False,
+    **kwargs
+) -> sqlite3.Connection:
+    """
+    Open SQLite connection with tuned PRAGMAs.
+
+    WAL lets dashboard readers run alongside the heartbeat writer, and
+    synchronous=NORMAL drops the per-commit fsync to one per checkpoint.
+    journal_mode is persistent, so only databases owned by the autonomous
+    system (metrics.db) should pass wal=True; local_vault.db lives in the
+    OneDrive workspace and is snapshotted as a single file.
+
+    Args:
+        path: Database file
+        wal: Switch database to WAL journal with synchronous=NORMAL
+        cache_size: PRAGMA cache_size (negative values are KiB)
+        mmap_size: Bytes of the file to memory-map for reads
+        readonly: Open with a mode=ro URI (no write locks, missing file errors)
+        **kwargs: Extra arguments for sqlite3.connect
+
+    Returns:
+        Open connection
+    """
+
+    if readonly:
+        # Workspace paths contain spaces; quote so they survive URI parsing
+        conn = sqlite3.connect(f"file:{urllib.parse.quote(str(path))}?mode=ro", uri=True, **kwargs)
+    else:
+        conn = sqlite3.connect(str(path), **kwargs)
+
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+    # PRAGMA values cannot be bound as parameters
+    if cache_size is not None:
+        conn.execute(f"PRAGMA cache_size={int(cache_size)}")
+    if mmap_size is not None:
+        conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+
+    return conn
+
+
+@functools.lru_cache(maxsize=256)
+def build_update_sql(table: str, update_keys: Tuple[str, ...], condition_keys: Tuple[str, ...]) -> str:
+    """
+    Parameterized UPDATE for one (table, columns) shape.
+
+    Cached so repeated updates reuse the exact SQL text, which also lets
+    sqlite3's per-connection statement cache skip re-preparing it. Bind
+    values in update_keys then condition_keys order.
+    """
+
+    set_clause = ", ".join([f"{k} = ?" for k in update_keys])
+    where_clause = " AND ".join([f"{k} = ?" for k in condition_keys]) if condition_keys else "1=1"
+
+    return f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
+
+
+def load_schema(conn: sqlite3.Connection) -> Dict[str, FrozenSet[str]]:
+    """
+    Tables and their columns, read from the database's own catalog.
+
+    Used as the identifier whitelist for SQL that has to interpolate
+    table/column names; PRAGMA schema_version tells callers when to reload.
+    """
+
+    schema: Dict[str, set] = {}
+    for table, column in conn.execute(
+        "SELECT m.name, p.name FROM sqlite_master AS m, pragma_table_info(m.name) AS p "
+        "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'"
+    ):
+        schema.setdefault(table, set()).add(column)
+
+    return {table: frozenset(columns) for table, columns in schema.items()}
+
+
+def check_identifiers(
+    schema: Dict[str, FrozenSet[str]],
+    table: str,
+    columns: Iterable[str]
+) -> Optional[str]:
+    """
+    Validate a table and columns against load_schema() output.
+
+    Returns:
+        None if all are known, else an error in SQLite's own wording
+        ("no such table/column"), which FixGenerator already recognizes
+    """
+
+    allowed = schema.get(table) if isinstance(table, str) else None
+    if allowed is None:
+        return f"no such table: {table}"
+
+    for column in columns:
+        if column not in allowed:
+            return f"no such column: {column}"
+
+    return None
+
+
+def ensure_metrics_indexes(conn: sqlite3.Connection) -> bool:
+    """
+    Create any missing METRICS_INDEXES on a metrics.db connection.
+
+    ANALYZE runs only when an index was added, so the planner picks the
+    covering path without re-analyzing on every open.
+
+    Returns:
+        True if indexes were created
+    """
+
+    existing = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    missing = [name for name in METRICS_INDEXES if name not in existing]
+
+    for name in missing:
+        conn.execute(METRICS_INDEXES[name])
+
+    if missing:
+        conn.execute("ANALYZE")
+        conn.commit()
+
+    return bool(missing)
+
+
+def ensure_metrics_rollups(conn: sqlite3.Connection) -> bool:
+    """
+    Create hourly_metrics and its triggers on a metrics.db connection.
+
+    Creation and backfill run in one IMMEDIATE transaction, so a concurrent
+    heartbeat insert lands either in the backfill or through the trigger.
+    On failure (e.g. a read-only connection) the transaction is rolled back
+    before the error is re-raised.
+
+    Returns:
+        True if the rollup was created
+    """
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hourly_metrics'"
+    ).fetchone()
+    if exists:
+        return False
+
+    try:
+        conn.executescript(METRICS_ROLLUP_SCRIPT)
+    except sqlite3.Error:
+        # A failed statement leaves BEGIN IMMEDIATE open; callers that carry on
+        # with this connection would otherwise read a frozen snapshot forever
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    return True
+
+
+def rollup_bounds(since: datetime) -> Tuple[str, str, str]:
+    """
+    Split a created_at > since window for hourly_metrics queries.
+
+    Returns:
+        (since_iso, since_bucket, next_bucket): whole buckets after
+        since_bucket come from the rollup; rows in the partial first hour
+        (since_iso < created_at < next_bucket) come from execution_metrics
+    """
+
+    hour = since.replace(minute=0, second=0, microsecond=0)
+    return (
+        since.isoformat(),
+        hour.isoformat()[:13],
+        (hour + timedelta(hours=1)).isoformat()[:13]
+    )
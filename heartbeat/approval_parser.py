@@ -5,10 +5,68 @@ Handles real-world approval formats.
 """
 
 import json
-import re
-from typing import List, Dict, Any
+import mmap
+import os
+from typing import List, Dict, Any, Iterator, Tuple
 from pathlib import Path
 
+try:
+    # Linear-time DFA matching (pip install google-re2)
+    import re2 as re
+except ImportError:
+    import re
+
+try:
+    # SIMD multi-pattern scanner for action headers (pip install hyperscan)
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    # Faster JSON decoding (pip install orjson); its errors subclass JSONDecodeError
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+# Precompiled bytes patterns, run directly over the mmap'd file
+# (inline flags and no lookarounds, so they compile on re2 too)
+_CHECK_MARK = "✓".encode("utf-8")
+_ACTION_MARKER = b"## Azione #"
+_ACTION_HEADER_RE = re.compile(rb'## Azione #(\d+)[^\n]*\n')
+# Bytes \s is ASCII-only (and re2's also skips \v), but the str patterns this
+# replaced matched any Unicode space, e.g. the NBSP editors insert after [x]
+_SPACE = (
+    rb'(?:[\t-\r\x1c-\x20]|'
+    + b'|'.join(c.encode("utf-8") for c in "\x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004"
+                                           "\u2005\u2006\u2007\u2008\u2009\u200a\u2028"
+                                           "\u2029\u202f\u205f\u3000")
+    + rb')'
+)
+# [x] **APPROVA**, [X] **APPROVA**, [x] APPROVA, ✓ APPROVA
+_APPROVED_RE = re.compile(
+    rb'(?i)(?:\[x\]' + _SPACE + rb'+(?:\*\*)?APPROVA|' + _CHECK_MARK + _SPACE + rb'+APPROVA)'
+)
+_TYPE_RE = re.compile(rb'\*\*Tipo\*\*:\s*`?([^`\n]+)`?')
+_JSON_RE = re.compile(rb'(?s)```json\s*(.*?)\s*```')
+_BASH_RE = re.compile(rb'(?s)```bash\s*(.*?)\s*```')
+_DIGITS_RE = re.compile(rb'\d+')
+
+if hyperscan is not None:
+    # One match per header, reported at the first digit of the action id
+    _HEADER_DB = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    _HEADER_DB.compile(
+        expressions=[_ACTION_MARKER + rb'\d'],
+        ids=[1],
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST]
+    )
+else:
+    _HEADER_DB = None
+
+# Last parse result keyed by (path, mtime_ns, size); one entry is enough
+# since the heartbeat only ever parses PENDING_APPROVAL.md
+_PARSE_CACHE: Dict[Tuple[str, int, int], List[Dict[str, Any]]] = {}
+
 
 def parse_pending_approvals(file_path: Path) -> List[Dict[str, Any]]:
     """
@@ -28,25 +86,44 @@ def parse_pending_approvals(file_path: Path) -> List[Dict[str, Any]]:
     if not file_path.exists():
         return []
 
-    with open(file_path, "r") as f:
-        content = f.read()
+    with open(file_path, "rb") as f:
+        st = os.fstat(f.fileno())
+
+        # mmap cannot map an empty file
+        if st.st_size == 0:
+            return []
+
+        # Unchanged file: reuse the previous cycle's tasks
+        key = (str(file_path), st.st_mtime_ns, st.st_size)
+        cached = _PARSE_CACHE.get(key)
+        if cached is not None:
+            return list(cached)
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            tasks = _parse_actions(content)
+
+    _PARSE_CACHE.clear()
+    _PARSE_CACHE[key] = tasks
+
+    return list(tasks)
+
+
+def _parse_actions(content: mmap.mmap) -> List[Dict[str, Any]]:
+    """Build approved tasks from the raw file contents."""
 
     tasks = []
 
     # Split by actions (## Azione #N)
-    action_pattern = r'## Azione #(\d+)[^\n]*\n(.*?)(?=## Azione #|\Z)'
-    actions = re.findall(action_pattern, content, re.DOTALL)
-
-    for action_id, action_content in actions:
+    for action_id, start, end in _iter_actions(content):
         # Check if approved
-        if not _is_approved(action_content):
+        if not _is_approved(content, start, end):
             continue
 
         # Extract action type
-        action_type = _extract_action_type(action_content)
+        action_type = _extract_action_type(content, start, end)
 
         # Try to extract JSON payload
-        json_payload = _extract_json_payload(action_content)
+        json_payload = _extract_json_payload(content, start, end)
 
         if json_payload:
             # JSON format found
@@ -60,7 +137,7 @@ def parse_pending_approvals(file_path: Path) -> List[Dict[str, Any]]:
             tasks.append(task)
         else:
             # Bash command format (or other)
-            bash_commands = _extract_bash_commands(action_content)
+            bash_commands = _extract_bash_commands(content, start, end)
 
             if bash_commands:
                 task = {
@@ -68,7 +145,7 @@ def parse_pending_approvals(file_path: Path) -> List[Dict[str, Any]]:
                     "action_type": action_type or "execute_script",
                     "payload": {
                         "commands": bash_commands,
-                        "description": _extract_description(action_content)
+                        "description": _extract_description(content, start, end)
                     },
                     "source": "PENDING_APPROVAL.md",
                     "approval_format": "bash"
@@ -78,56 +155,106 @@ def parse_pending_approvals(file_path: Path) -> List[Dict[str, Any]]:
     return tasks
 
 
-def _is_approved(content: str) -> bool:
-    """Check if action is approved."""
+def _iter_actions(content: mmap.mmap) -> Iterator[Tuple[str, int, int]]:
+    """
+    Yield (action_id, start, end) for each action.
 
-    # Check for various approval patterns
-    patterns = [
-        r'\[x\]\s+\*\*APPROVA',           # [x] **APPROVA**
-        r'\[X\]\s+\*\*APPROVA',           # [X] **APPROVA**
-        r'\[x\]\s+APPROVA',               # [x] APPROVA
-        r'✓\s+APPROVA',                   # ✓ APPROVA
-    ]
+    The body span runs from the end of the header line to the next action
+    marker, so helpers can search in place without copying the body.
+    """
+
+    for action_id, body_start in _iter_headers(content):
+        end = content.find(_ACTION_MARKER, body_start)
+        if end == -1:
+            end = len(content)
+        yield action_id, body_start, end
+
+
+def _iter_headers(content: mmap.mmap) -> Iterator[Tuple[str, int]]:
+    """Yield (action_id, end of header line) for each action header."""
+
+    if _HEADER_DB is None:
+        for match in _ACTION_HEADER_RE.finditer(content):
+            yield match.group(1).decode("ascii"), match.end()
+        return
+
+    # Single vectorized pass collecting header start offsets
+    starts = []
+    _HEADER_DB.scan(
+        content,
+        match_event_handler=lambda id, start, end, flags, context: starts.append(start)
+    )
+
+    # Same semantics as _ACTION_HEADER_RE: header must end with a newline,
+    # and a second marker on the same header line is not a new action
+    header_end = 0
+    for start in starts:
+        if start < header_end:
+            continue
+        line_end = content.find(b"\n", start)
+        if line_end == -1:
+            break
+        digits = _DIGITS_RE.match(content, start + len(_ACTION_MARKER))
+        header_end = line_end + 1
+        yield digits.group(0).decode("ascii"), header_end
 
-    for pattern in patterns:
-        if re.search(pattern, content, re.IGNORECASE):
-            return True
 
-    return False
+def _is_approved(content: bytes, start: int, end: int) -> bool:
+    """Check if action is approved."""
+
+    # Fast path: every approval marker needs a checkbox or a check mark
+    if (content.find(b"[x]", start, end) == -1
+            and content.find(b"[X]", start, end) == -1
+            and content.find(_CHECK_MARK, start, end) == -1):
+        return False
 
+    # Single pass over all approval patterns
+    return _APPROVED_RE.search(content, start, end) is not None
 
-def _extract_action_type(content: str) -> str:
+
+def _extract_action_type(content: bytes, start: int, end: int) -> str:
     """Extract action type from content."""
 
     # Look for **Tipo**: pattern
-    match = re.search(r'\*\*Tipo\*\*:\s*`?([^`\n]+)`?', content)
+    if content.find(b"**Tipo**", start, end) == -1:
+        return None
+
+    match = _TYPE_RE.search(content, start, end)
     if match:
-        return match.group(1).strip()
+        return match.group(1).decode("utf-8").strip()
 
     return None
 
 
-def _extract_json_payload(content: str) -> Dict[str, Any]:
+def _extract_json_payload(content: bytes, start: int, end: int) -> Dict[str, Any]:
     """Extract JSON payload from markdown code block."""
 
+    # Fast path: skip regex when there is no json fence
+    if content.find(b"```json", start, end) == -1:
+        return None
+
     # Look for ```json ... ```
-    match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
+    match = _JSON_RE.search(content, start, end)
     if match:
         try:
-            return json.loads(match.group(1))
-        except json.JSONDecodeError:
+            return json_loads(match.group(1))
+        except (json.JSONDecodeError, UnicodeDecodeError):
             pass
 
     return None
 
 
-def _extract_bash_commands(content: str) -> List[str]:
+def _extract_bash_commands(content: bytes, start: int, end: int) -> List[str]:
     """Extract bash commands from markdown code block."""
 
+    # Fast path: skip regex when there is no bash fence
+    if content.find(b"```bash", start, end) == -1:
+        return []
+
     # Look for ```bash ... ```
-    match = re.search(r'```bash\s*(.*?)\s*```', content, re.DOTALL)
+    match = _BASH_RE.search(content, start, end)
     if match:
-        commands = match.group(1).strip().split('\n')
+        commands = match.group(1).decode("utf-8").strip().split('\n')
         # Filter out comments and empty lines
         return [
             cmd.strip()
@@ -138,11 +265,11 @@ def _extract_bash_commands(content: str) -> List[str]:
     return []
 
 
-def _extract_description(content: str) -> str:
+def _extract_description(content: bytes, start: int, end: int) -> str:
     """Extract action description."""
 
     # Look for first paragraph after action header
-    lines = content.split('\n')
+    lines = content[start:end].decode("utf-8").split('\n')
     description_lines = []
 
     in_description = False
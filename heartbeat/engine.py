@@ -4,6 +4,7 @@ Autonomous System - Heartbeat Engine
 Main orchestrator for autonomous task execution cycles.
 """
 
+import collections
 import json
 import os
 import sqlite3
@@ -11,17 +12,25 @@ import sys
 import uuid
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
+
+try:
+    # Faster JSON decoding (pip install orjson); its errors subclass JSONDecodeError
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 # Add router and sandbox to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "router"))
 sys.path.insert(0, str(Path(__file__).parent.parent / "sandbox"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
 sys.path.insert(0, str(Path(__file__).parent))
 
-from risk_scorer import calculate_risk_score
+from risk_scorer import calculate_risk_score_fast
 from decision_engine import make_decision, ActionType
 from approval_parser import parse_pending_approvals
 from orchestrator import SandboxOrchestrator
+from db import open_db
 
 
 # Paths
@@ -32,13 +41,30 @@ METRICS_DB = Path.home() / ".claude" / "autonomous" / "metrics.db"
 KILL_SWITCH = Path.home() / ".claude" / "autonomous" / "KILL_SWITCH"
 LOG_DIR = Path.home() / ".claude" / "autonomous" / "logs"
 
+# Constant SQL text so the connection's statement cache hits every cycle
+_INSERT_METRIC_SQL = """
+    INSERT INTO execution_metrics (
+        task_id, task_type, risk_level, risk_score, sandbox_score,
+        status, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_HEALTH_SQL = """
+    INSERT INTO system_health (
+        heartbeat_cycle_id, tasks_discovered, tasks_executed,
+        tasks_failed, tasks_escalated, cycle_duration_seconds,
+        status, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class HeartbeatEngine:
     """Main orchestrator for autonomous execution."""
 
-    def __init__(self, dry_run: bool = True, profile: str = "autonomous"):
+    def __init__(self, dry_run: bool = True, profile: str = "autonomous", verbose: bool = False):
         self.dry_run = dry_run
         self.profile = profile
+        # Also print the sandbox orchestrator's per-iteration trace
+        self.verbose = verbose
         self.cycle_id = str(uuid.uuid4())[:8]
         self.stats = {
             "discovered": 0,
@@ -47,22 +73,50 @@ class HeartbeatEngine:
             "escalated": 0,
             "blocked": 0
         }
+        # Metrics rows queued during the cycle, written in one batch
+        self._metrics_rows = []
+        # metrics.db connection reused across cycles
+        self._metrics_conn = None
+        # (log_date, line) pairs buffered during a cycle, written at cycle end
+        self._log_buf = None
 
     def log(self, message: str, level: str = "INFO"):
         """Log message to console and file."""
 
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        log_date = timestamp[:10]
         log_line = f"[{timestamp}] [{level}] [Cycle:{self.cycle_id}] {message}"
 
         print(log_line)
 
-        # Log to file
-        log_date = datetime.now().strftime("%Y-%m-%d")
+        # Log to file (buffered in memory during a cycle)
+        if self._log_buf is not None:
+            self._log_buf.append((log_date, log_line + "\n"))
+            return
+
+        with self._open_log(log_date) as f:
+            f.write(log_line + "\n")
+
+    def _flush_log(self):
+        """Write buffered lines with one write per log date."""
+
+        # A cycle that crosses midnight spans two daily log files
+        by_date = {}
+        for log_date, line in self._log_buf:
+            by_date.setdefault(log_date, []).append(line)
+        self._log_buf.clear()
+
+        for log_date, lines in by_date.items():
+            with self._open_log(log_date) as f:
+                f.write("".join(lines))
+
+    def _open_log(self, log_date: str):
+        """Open heartbeat.log for the given YYYY-MM-DD date for appending."""
+
         log_file = LOG_DIR / log_date / "heartbeat.log"
         log_file.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(log_file, "a") as f:
-            f.write(log_line + "\n")
+        return open(log_file, "a")
 
     def check_kill_switch(self) -> bool:
         """Check if kill switch is active."""
@@ -90,9 +144,19 @@ class HeartbeatEngine:
 
         # Query local_vault.db for pending tasks
         if LOCAL_VAULT_DB.exists():
+            tasks.extend(self._iter_vault_tasks())
+
+        self.stats["discovered"] = len(tasks)
+        return tasks
+
+    def _iter_vault_tasks(self) -> Iterator[Dict[str, Any]]:
+        """Yield pending local_vault.db tasks, fetching rows in batches."""
+
+        try:
+            conn = open_db(LOCAL_VAULT_DB, wal=False)
             try:
-                conn = sqlite3.connect(str(LOCAL_VAULT_DB))
                 cursor = conn.cursor()
+                cursor.arraysize = 64
 
                 cursor.execute("""
                     SELECT id, task_type, payload
@@ -101,27 +165,29 @@ class HeartbeatEngine:
                     LIMIT 10
                 """)
 
-                for row in cursor.fetchall():
-                    task_id, task_type, payload_json = row
-                    try:
-                        payload = json.loads(payload_json) if payload_json else {}
-                        task = {
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+
+                    for task_id, task_type, payload_json in rows:
+                        try:
+                            payload = json_loads(payload_json) if payload_json else {}
+                        except json.JSONDecodeError as e:
+                            self.log(f"Invalid payload JSON in task {task_id}: {e}", "ERROR")
+                            continue
+
+                        self.log(f"Discovered task from DB: {task_id} ({task_type})")
+                        yield {
                             "task_id": f"db_{task_id}",
                             "action_type": task_type,  # Map task_type to action_type
                             "payload": payload,
                             "source": "local_vault.db"
                         }
-                        tasks.append(task)
-                        self.log(f"Discovered task from DB: {task_id} ({task_type})")
-                    except json.JSONDecodeError as e:
-                        self.log(f"Invalid payload JSON in task {task_id}: {e}", "ERROR")
-
+            finally:
                 conn.close()
-            except sqlite3.Error as e:
-                self.log(f"Database query error: {e}", "ERROR")
-
-        self.stats["discovered"] = len(tasks)
-        return tasks
+        except sqlite3.Error as e:
+            self.log(f"Database query error: {e}", "ERROR")
 
     def process_task(self, task: Dict[str, Any]):
         """Process a single task through risk scoring and routing."""
@@ -132,7 +198,7 @@ class HeartbeatEngine:
         self.log(f"Processing task {task_id} ({action_type})")
 
         # Calculate risk
-        risk_score, risk_level, breakdown = calculate_risk_score(task)
+        risk_score, risk_level = calculate_risk_score_fast(task)
         self.log(f"  Risk Score: {risk_score}/100 ({risk_level.value})")
 
         # Make routing decision
@@ -149,7 +215,9 @@ class HeartbeatEngine:
 
             try:
                 target_score = decision.get("sandbox_threshold", 95)
-                orchestrator = SandboxOrchestrator(task, max_iterations=5, target_score=target_score)
+                orchestrator = SandboxOrchestrator(
+                    task, max_iterations=5, target_score=target_score, verbose=self.verbose
+                )
                 sandbox_success, sandbox_score, sandbox_result = orchestrator.run()
 
                 self.log(f"  Sandbox result: score={sandbox_score}/100, success={sandbox_success}", "INFO")
@@ -193,17 +261,9 @@ class HeartbeatEngine:
             self._record_metrics(task, risk_score, risk_level.value, decision, sandbox_score)
 
     def _record_metrics(self, task: Dict[str, Any], risk_score: int, risk_level: str, decision: Dict[str, Any], sandbox_score: int = None):
-        """Record execution metrics to database."""
+        """Queue execution metrics; written by record_cycle_health."""
 
-        conn = sqlite3.connect(str(METRICS_DB))
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO execution_metrics (
-                task_id, task_type, risk_level, risk_score, sandbox_score,
-                status, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        self._metrics_rows.append((
             task.get("task_id"),
             task.get("action_type"),
             risk_level,
@@ -213,24 +273,21 @@ class HeartbeatEngine:
             datetime.now().isoformat()
         ))
 
-        conn.commit()
-        conn.close()
-
     def record_cycle_health(self, start_time: datetime):
-        """Record heartbeat cycle health to database."""
+        """Record queued execution metrics and cycle health to database."""
 
         duration = (datetime.now() - start_time).total_seconds()
 
-        conn = sqlite3.connect(str(METRICS_DB))
-        cursor = conn.cursor()
+        if self._metrics_conn is None:
+            self._metrics_conn = open_db(METRICS_DB)
+        conn = self._metrics_conn
+
+        # Flush the cycle's metrics in the same transaction
+        if self._metrics_rows:
+            conn.executemany(_INSERT_METRIC_SQL, self._metrics_rows)
+            self._metrics_rows.clear()
 
-        cursor.execute("""
-            INSERT INTO system_health (
-                heartbeat_cycle_id, tasks_discovered, tasks_executed,
-                tasks_failed, tasks_escalated, cycle_duration_seconds,
-                status, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        conn.execute(_INSERT_HEALTH_SQL, (
             self.cycle_id,
             self.stats["discovered"],
             self.stats["executed"],
@@ -242,11 +299,28 @@ class HeartbeatEngine:
         ))
 
         conn.commit()
-        conn.close()
+
+    def close(self):
+        """Close the persistent metrics connection."""
+
+        if self._metrics_conn is not None:
+            self._metrics_conn.close()
+            self._metrics_conn = None
 
     def run_cycle(self):
         """Execute one heartbeat cycle."""
 
+        # Console output stays live; heartbeat.log is written once per cycle
+        self._log_buf = collections.deque()
+        try:
+            self._run_cycle()
+        finally:
+            self._flush_log()
+            self._log_buf = None
+
+    def _run_cycle(self):
+        """Cycle phases: discovery, processing, summary, health."""
+
         start_time = datetime.now()
 
         self.log("=" * 60)
@@ -300,10 +374,11 @@ if __name__ == "__main__":
     run_once = "--run-once" in sys.argv
     verbose = "--verbose" in sys.argv
 
-    engine = HeartbeatEngine(dry_run=dry_run)
+    engine = HeartbeatEngine(dry_run=dry_run, verbose=verbose)
 
     if run_once:
         engine.run_cycle()
+        engine.close()
     else:
         print("Heartbeat engine requires --run-once flag for manual execution")
         print("For scheduled execution, use launchd (Week 5)")
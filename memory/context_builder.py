@@ -4,45 +4,93 @@ Autonomous System - Context Builder
 Builds workspace context for informed decision-making.
 """
 
-import sqlite3
+import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, Any
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
+
+from db import open_db, METRICS_DB_OPTIONS
+
 METRICS_DB = Path.home() / ".claude" / "autonomous" / "metrics.db"
 WORKSPACE_DB = Path.home() / "Library" / "CloudStorage" / "OneDrive-SAPASPA" / "OD PARA Sales Strategy" / "Claude Workspace" / "local_vault.db"
 
+# metrics.db runs in WAL mode: commits touch the -wal file, not the main file
+_CONTEXT_SOURCES = (METRICS_DB, METRICS_DB.with_name(METRICS_DB.name + "-wal"), WORKSPACE_DB)
+
+# Rendered contexts keyed by (days, generated minute, source file stamps)
+_CONTEXT_CACHE: Dict[tuple, str] = {}
+_CONTEXT_CACHE_MAX = 8
+
+
+def _sources_state() -> tuple:
+    """Return (mtime_ns, size) of each context source, None if missing."""
+
+    state = []
+    for path in _CONTEXT_SOURCES:
+        try:
+            st = path.stat()
+            state.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            state.append(None)
+
+    return tuple(state)
+
 
 class ContextBuilder:
     """Builds execution context from workspace state."""
 
     def build_context(self, days: int = 7) -> str:
-        """Build markdown context for last N days."""
+        """Build markdown context for last N days (cached within the minute until a source DB changes)."""
+
+        # The header and the days window both move with the clock, so the
+        # rendered minute is part of the key
+        now = datetime.now()
+        generated = now.strftime('%Y-%m-%d %H:%M')
+        key = (days, generated, _sources_state())
+        cached = _CONTEXT_CACHE.get(key)
+        if cached is not None:
+            return cached
 
         context_parts = [
             "# Workspace Context",
-            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+            f"Generated: {generated}",
             ""
         ]
 
-        # Recent task stats
-        context_parts.extend(self._build_task_stats(days))
+        # One session for all aggregations; workspace DB is attached as ws
+        conn = open_db(METRICS_DB, **METRICS_DB_OPTIONS)
+        try:
+            cursor = conn.cursor()
+            # ATTACH would create a missing file, so only attach existing vaults
+            if WORKSPACE_DB.exists():
+                cursor.execute("ATTACH DATABASE ? AS ws", (str(WORKSPACE_DB),))
 
-        # Entity stats
-        context_parts.extend(self._build_entity_stats())
+            # Recent task stats
+            context_parts.extend(self._build_task_stats(cursor, days, now))
 
-        # Memory highlights
-        context_parts.extend(self._build_memory_highlights())
+            # Entity stats
+            context_parts.extend(self._build_entity_stats(cursor))
 
-        return "\n".join(context_parts)
+            # Memory highlights
+            context_parts.extend(self._build_memory_highlights(cursor))
+        finally:
+            conn.close()
 
-    def _build_task_stats(self, days: int) -> list:
-        """Build recent task statistics."""
+        context = "\n".join(context_parts)
+
+        # Stale keys never hit again once a source changes or the minute rolls
+        if len(_CONTEXT_CACHE) >= _CONTEXT_CACHE_MAX:
+            _CONTEXT_CACHE.clear()
+        _CONTEXT_CACHE[key] = context
+
+        return context
 
-        conn = sqlite3.connect(str(METRICS_DB))
-        cursor = conn.cursor()
+    def _build_task_stats(self, cursor, days: int, now: datetime = None) -> list:
+        """Build recent task statistics."""
 
-        since = (datetime.now() - timedelta(days=days)).isoformat()
+        since = ((now or datetime.now()) - timedelta(days=days)).isoformat()
 
         cursor.execute("""
             SELECT COUNT(*),
@@ -53,7 +101,6 @@ class ContextBuilder:
         """, (since,))
 
         total, avg_score, executed = cursor.fetchone()
-        conn.close()
 
         return [
             f"\n## Recent Activity ({days} days)",
@@ -62,16 +109,12 @@ class ContextBuilder:
             f"- Executed: {executed or 0}"
         ]
 
-    def _build_entity_stats(self) -> list:
-        """Build entity statistics."""
+    def _build_entity_stats(self, cursor) -> list:
+        """Build entity statistics from the attached workspace DB."""
 
         try:
-            conn = sqlite3.connect(str(WORKSPACE_DB))
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT entity_type, COUNT(*) FROM entities GROUP BY entity_type")
+            cursor.execute("SELECT entity_type, COUNT(*) FROM ws.entities GROUP BY entity_type")
             stats = cursor.fetchall()
-            conn.close()
 
             lines = ["\n## Workspace Entities"]
             for entity_type, count in stats:
@@ -81,12 +124,9 @@ class ContextBuilder:
         except:
             return ["\n## Workspace Entities", "- (Unable to read)"]
 
-    def _build_memory_highlights(self) -> list:
+    def _build_memory_highlights(self, cursor) -> list:
         """Build memory highlights."""
 
-        conn = sqlite3.connect(str(METRICS_DB))
-        cursor = conn.cursor()
-
         cursor.execute("""
             SELECT category, COUNT(*)
             FROM memory_context
@@ -94,7 +134,6 @@ class ContextBuilder:
         """)
 
         stats = cursor.fetchall()
-        conn.close()
 
         lines = ["\n## Memory Context"]
         for category, count in stats:
@@ -4,12 +4,38 @@ Autonomous System - Memory Sync Engine
 Bidirectional sync between MEMORY.md and metrics database.
 """
 
-import re
-import sqlite3
+import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple
 
+try:
+    # Linear-time DFA matching (pip install google-re2)
+    import re2 as re
+except ImportError:
+    import re
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
+
+from db import open_db
+
+
+# Whitespace other than \n, spelled out: re2's \s is ASCII-only (and skips
+# \v), while the per-line re \s this replaced also matched NBSP and friends.
+# Not a raw string, so both engines see the literal characters.
+_HSPACE = "[\t\x0b\x0c\r\x1c-\x20\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]"
+
+# One alternation per line, tried in priority order: header, **Key**: Value,
+# - Key: Value, bold flag. Character classes exclude \n so no match spans lines.
+_LINE_RE = re.compile(
+    r'(?m)^(?:'
+    r'(?P<header>## .*)'
+    r'|\*\*(?P<bold_key>[^*\n]+)\*\*:' + _HSPACE + r'*(?P<bold_value>.+)'
+    r'|-' + _HSPACE + r'+(?P<dash_key>[^:\n]+):' + _HSPACE + r'*(?P<dash_value>.+)'
+    r'|(?P<flag>\*\*.*)'
+    r')'
+)
+
 
 # Paths
 MEMORY_FILE = Path.home() / ".claude" / "projects" / "-Users-giovanniaffinita" / "memory" / "MEMORY.md"
@@ -44,16 +70,15 @@ class MemorySyncEngine:
         print(f"[MemorySync] Parsed {len(entries)} memory entries")
 
         # Sync to database
-        conn = sqlite3.connect(str(self.db_path))
+        conn = open_db(self.db_path)
         cursor = conn.cursor()
 
-        synced = 0
-        for category, key, value in entries:
-            cursor.execute("""
-                INSERT OR REPLACE INTO memory_context (category, key, value, last_updated)
-                VALUES (?, ?, ?, ?)
-            """, (category, key, value, datetime.now().isoformat()))
-            synced += 1
+        now = datetime.now().isoformat()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO memory_context (category, key, value, last_updated)
+            VALUES (?, ?, ?, ?)
+        """, [(category, key, value, now) for category, key, value in entries])
+        synced = len(entries)
 
         conn.commit()
         conn.close()
@@ -69,7 +94,7 @@ class MemorySyncEngine:
             Dict of {category: [(key, value), ...]}
         """
 
-        conn = sqlite3.connect(str(self.db_path))
+        conn = open_db(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -99,37 +124,33 @@ class MemorySyncEngine:
         entries = []
         current_category = "general"
 
-        lines = content.split("\n")
+        for match in _LINE_RE.finditer(content):
+            kind = match.lastgroup
 
-        for i, line in enumerate(lines):
             # Detect category from headers
-            if line.startswith("## "):
-                current_category = line.replace("##", "").strip().lower().replace(" ", "_")
-                continue
+            if kind == "header":
+                current_category = match.group("header").replace("##", "").strip().lower().replace(" ", "_")
 
-            # Parse key-value patterns
             # Pattern 1: **Key**: Value
-            match = re.match(r'\*\*([^*]+)\*\*:\s*(.+)', line)
-            if match:
-                key = match.group(1).strip()
-                value = match.group(2).strip()
+            elif kind == "bold_value":
+                key = match.group("bold_key").strip()
+                value = match.group("bold_value").strip()
                 entries.append((current_category, key, value))
-                continue
 
             # Pattern 2: - Key: Value
-            match = re.match(r'-\s+([^:]+):\s*(.+)', line)
-            if match:
-                key = match.group(1).strip()
-                value = match.group(2).strip()
+            elif kind == "dash_value":
+                key = match.group("dash_key").strip()
+                value = match.group("dash_value").strip()
                 entries.append((current_category, key, value))
-                continue
 
             # Pattern 3: Bold text as flag
-            if line.startswith("**") and line.endswith("**"):
-                key = line.strip("*").strip()
+            elif match.group("flag").endswith("**"):
+                key = match.group("flag").strip("*").strip()
                 # Look ahead for next line as value
-                if i + 1 < len(lines):
-                    value = lines[i + 1].strip()
+                next_start = match.end() + 1
+                if next_start <= len(content):
+                    next_end = content.find("\n", next_start)
+                    value = content[next_start:next_end if next_end != -1 else len(content)].strip()
                     if value:
                         entries.append((current_category, key, value))
 
@@ -159,8 +180,18 @@ if __name__ == "__main__":
         for key, value in entries[:3]:  # Show first 3
             print(f"    - {key}: {value[:50]}...")
 
+    # Test 3: Unicode whitespace parses the same under re and re2
+    print("\nTest 3: Parse entries separated by non-breaking spaces")
+    sample = "## Prefs\n**Tone**:\u00a0formal\n-\u00a0Lang:\u3000it\n"
+    parsed = engine._parse_memory_content(sample)
+    expected = [("prefs", "Tone", "formal"), ("prefs", "Lang", "it")]
+    unicode_ok = parsed == expected
+    print(f"Result: {parsed} ({'✓' if unicode_ok else '✗'} engine: {re.__name__})")
+
     print("\n" + "=" * 60)
-    if synced > 0:
+    if not unicode_ok:
+        print("✗ Memory sync test FAILED (Unicode whitespace parsing)")
+    elif synced > 0:
         print("✓ Memory sync test PASSED")
     else:
         print("⚠ No memory entries synced (MEMORY.md might be empty)")
@@ -4,13 +4,99 @@ Autonomous System - Notification System
 macOS native notifications for autonomous events.
 """
 
+import atexit
+import queue
 import subprocess
-import sqlite3
+import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "common"))
+
+from db import open_db
+
 METRICS_DB = Path.home() / ".claude" / "autonomous" / "metrics.db"
+OSASCRIPT = "/usr/bin/osascript"
+
+# Constant statement; values are substituted as quoted AppleScript literals
+_SCRIPT = "display notification {message} with title {title} sound name {sound}"
+# Escape backslash and quote; line breaks become escapes to keep one statement per line
+_LITERAL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+
+
+def _as_literal(value: str) -> str:
+    """Quote value as an AppleScript string literal."""
+
+    return '"' + str(value).translate(_LITERAL_ESCAPES) + '"'
+
+
+_INSERT_NOTIFICATION_SQL = """
+    INSERT INTO user_notifications (notification_type, severity, title, message, delivered, created_at, delivered_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Notification rows handed to a background writer, so notify never waits on SQLite
+_LOG_Q = queue.Queue(maxsize=1024)
+_LOG_WINDOW = 0.1  # seconds
+_log_thread = None
+_log_thread_lock = threading.Lock()
+
+
+def _drain(q: queue.Queue, timeout: float) -> list:
+    """Wait up to timeout for one row, then take everything already queued."""
+
+    try:
+        batch = [q.get(timeout=timeout)]
+    except queue.Empty:
+        return []
+
+    while True:
+        try:
+            batch.append(q.get_nowait())
+        except queue.Empty:
+            return batch
+
+
+def _log_writer():
+    """Drain queued notification rows into metrics.db in batches."""
+
+    conn = None
+
+    while True:
+        batch = _drain(_LOG_Q, _LOG_WINDOW)
+        if not batch:
+            continue
+
+        try:
+            if conn is None:
+                conn = open_db(METRICS_DB)
+            conn.executemany(_INSERT_NOTIFICATION_SQL, batch)
+            conn.commit()
+        except Exception as e:
+            print(f"[Notifier] Log error: {e}")
+            if conn is not None:
+                conn.close()
+                conn = None
+        finally:
+            for _ in batch:
+                _LOG_Q.task_done()
+
+
+def _start_log_writer():
+    """Start the writer thread once per process."""
+
+    global _log_thread
+
+    with _log_thread_lock:
+        if _log_thread is None:
+            _log_thread = threading.Thread(target=_log_writer, name="notifier-log", daemon=True)
+            _log_thread.start()
+
+
+# Daemon thread dies with the interpreter: write out what is still queued
+atexit.register(_LOG_Q.join)
 
 
 class Notifier:
@@ -18,6 +104,38 @@ class Notifier:
 
     def __init__(self):
         self.enabled = True
+        # Long-lived interactive osascript, spawned on first notification
+        self._proc = None
+
+    def _osascript(self) -> subprocess.Popen:
+        """Return the osascript coprocess, respawning it if it exited."""
+
+        if self._proc is None or self._proc.poll() is not None:
+            # -i executes each line as it arrives instead of waiting for EOF
+            self._proc = subprocess.Popen(
+                [OSASCRIPT, "-i"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                text=True
+            )
+
+        return self._proc
+
+    def close(self):
+        """Terminate the osascript coprocess."""
+
+        proc, self._proc = getattr(self, "_proc", None), None
+        if proc is None:
+            return
+
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+
+    def __del__(self):
+        self.close()
 
     def notify(self, title: str, message: str, sound: str = "default") -> bool:
         """
@@ -36,24 +154,20 @@ class Notifier:
             return False
 
         try:
-            # Use osascript for native macOS notifications
-            script = f'''
-            display notification "{message}" with title "{title}" sound name "{sound}"
-            '''
-
-            result = subprocess.run(
-                ["/usr/bin/osascript", "-e", script],
-                capture_output=True,
-                text=True,
-                timeout=5
+            # Use osascript for native macOS notifications; one line per
+            # statement, streamed to the coprocess (errors go to stderr)
+            script = _SCRIPT.format(
+                message=_as_literal(message),
+                title=_as_literal(title),
+                sound=_as_literal(sound)
             )
 
-            if result.returncode == 0:
-                self._log_notification(title, message)
-                return True
-            else:
-                print(f"[Notifier] Failed: {result.stderr}")
-                return False
+            proc = self._osascript()
+            proc.stdin.write(script + "\n")
+            proc.stdin.flush()
+
+            self._log_notification(title, message)
+            return True
 
         except Exception as e:
             print(f"[Notifier] Error: {e}")
@@ -92,21 +206,15 @@ class Notifier:
         )
 
     def _log_notification(self, title: str, message: str):
-        """Log notification to database."""
-
-        try:
-            conn = sqlite3.connect(str(METRICS_DB))
-            cursor = conn.cursor()
+        """Queue notification for the background database writer."""
 
-            cursor.execute("""
-                INSERT INTO user_notifications (notification_type, severity, title, message, delivered, created_at, delivered_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, ("system", "info", title, message, 1, datetime.now().isoformat(), datetime.now().isoformat()))
+        _start_log_writer()
 
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print(f"[Notifier] Log error: {e}")
+        now = datetime.now().isoformat()
+        try:
+            _LOG_Q.put_nowait(("system", "info", title, message, 1, now, now))
+        except queue.Full:
+            print("[Notifier] Log error: queue full, notification not recorded")
 
 
 # CLI test
@@ -131,5 +239,7 @@ if __name__ == "__main__":
     success = notifier.notify_task_failed("test_task_2", "Database connection timeout")
     print(f"Result: {'✓ Sent' if success else '✗ Failed'}")
 
+    notifier.close()
+
     print("\n" + "=" * 60)
     print("Check your macOS notifications to verify!")
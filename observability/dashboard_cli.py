@@ -4,15 +4,53 @@ Autonomous System - CLI Dashboard
 Command-line interface for monitoring and control.
 """
 
+import json
+import os
 import sqlite3
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
+
+from db import open_db, ensure_metrics_indexes, ensure_metrics_rollups, rollup_bounds
+
 
 DB_PATH = Path.home() / ".claude" / "autonomous" / "metrics.db"
 KILL_SWITCH = Path.home() / ".claude" / "autonomous" / "KILL_SWITCH"
+LOG_DIR = Path.home() / ".claude" / "autonomous" / "logs"
+
+# get_recent_logs: files below this size are read whole, larger ones tailed
+TAIL_SMALL_FILE = 64 * 1024
+TAIL_BLOCK = 8192
+
+# Shared read connection, opened on first use
+_conn = None
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Return the dashboard's metrics connection, opening it once."""
+
+    global _conn
+
+    if _conn is None:
+        _conn = open_db(
+            DB_PATH,
+            cache_size=-50000,
+            mmap_size=268435456,
+            check_same_thread=False,
+            isolation_level=None
+        )
+
+        try:
+            ensure_metrics_indexes(_conn)
+            ensure_metrics_rollups(_conn)
+        except sqlite3.OperationalError:
+            # Schema not initialized yet (or read-only file): query without them
+            pass
+
+    return _conn
 
 
 def get_stats(hours: int = 24) -> dict:
@@ -28,23 +66,41 @@ def get_stats(hours: int = 24) -> dict:
             "avg_sandbox_score": 0
         }
 
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
+    cursor = _get_conn().cursor()
 
     since = datetime.now() - timedelta(hours=hours)
 
-    # Overall stats
+    # Overall stats and risk distribution in one round-trip, summed from
+    # hourly rollups plus the exact rows of the partial first hour
     cursor.execute("""
+        WITH recent AS (
+            SELECT status, risk_level, count, exec_time_count, sum_exec_time,
+                   sandbox_count, sum_sandbox_score
+            FROM hourly_metrics
+            WHERE bucket > :bucket
+            UNION ALL
+            SELECT status, risk_level, 1,
+                   execution_time_seconds IS NOT NULL, COALESCE(execution_time_seconds, 0),
+                   sandbox_score IS NOT NULL, COALESCE(sandbox_score, 0)
+            FROM execution_metrics
+            WHERE created_at > :since AND created_at < :next_bucket
+        ),
+        risk AS (
+            SELECT risk_level, SUM(count) AS count
+            FROM recent
+            GROUP BY risk_level
+            HAVING SUM(count) > 0
+        )
         SELECT
-            COUNT(*) as total,
-            SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) as successful,
-            SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed,
-            SUM(CASE WHEN status = 'rolled_back' THEN 1 ELSE 0 END) as rolled_back,
-            AVG(execution_time_seconds) as avg_exec_time,
-            AVG(sandbox_score) as avg_sandbox_score
-        FROM execution_metrics
-        WHERE created_at > ?
-    """, (since.isoformat(),))
+            SUM(count) as total,
+            SUM(CASE WHEN status = 'success' THEN count ELSE 0 END) as successful,
+            SUM(CASE WHEN status = 'failed' THEN count ELSE 0 END) as failed,
+            SUM(CASE WHEN status = 'rolled_back' THEN count ELSE 0 END) as rolled_back,
+            SUM(sum_exec_time) / SUM(exec_time_count) as avg_exec_time,
+            SUM(sum_sandbox_score) * 1.0 / SUM(sandbox_count) as avg_sandbox_score,
+            (SELECT json_group_object(risk_level, count) FROM risk) as risk_distribution
+        FROM recent
+    """, dict(zip(("since", "bucket", "next_bucket"), rollup_bounds(since))))
 
     row = cursor.fetchone()
 
@@ -54,20 +110,10 @@ def get_stats(hours: int = 24) -> dict:
         "failed": row[2] or 0,
         "rolled_back": row[3] or 0,
         "avg_execution_time": round(row[4], 1) if row[4] else 0,
-        "avg_sandbox_score": round(row[5], 1) if row[5] else 0
+        "avg_sandbox_score": round(row[5], 1) if row[5] else 0,
+        "risk_distribution": json.loads(row[6]) if row[6] else {}
     }
 
-    # Risk distribution
-    cursor.execute("""
-        SELECT risk_level, COUNT(*) as count
-        FROM execution_metrics
-        WHERE created_at > ?
-        GROUP BY risk_level
-    """, (since.isoformat(),))
-
-    stats["risk_distribution"] = {row[0]: row[1] for row in cursor.fetchall()}
-
-    conn.close()
     return stats
 
 
@@ -81,8 +127,7 @@ def get_health() -> dict:
     }
 
     if health["database"]:
-        conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
+        cursor = _get_conn().cursor()
 
         cursor.execute("""
             SELECT created_at
@@ -95,23 +140,40 @@ def get_health() -> dict:
         if row:
             health["last_heartbeat"] = row[0]
 
-        conn.close()
-
     return health
 
 
 def get_recent_logs(lines: int = 20) -> list:
     """Get recent log entries."""
 
-    log_dir = Path.home() / ".claude" / "autonomous" / "logs"
-    today_log = log_dir / datetime.now().strftime("%Y-%m-%d") / "execution.log"
+    today_log = LOG_DIR / datetime.now().strftime("%Y-%m-%d") / "execution.log"
 
     if not today_log.exists():
         return []
 
-    with open(today_log, "r") as f:
-        all_lines = f.readlines()
-        return all_lines[-lines:]
+    # Small files: a plain read is cheaper than seeking around
+    if today_log.stat().st_size < TAIL_SMALL_FILE:
+        with open(today_log, "r") as f:
+            all_lines = f.readlines()
+            return all_lines[-lines:]
+
+    if lines <= 0:
+        return []
+
+    # Read backwards in blocks until the last N lines are buffered
+    with open(today_log, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= lines:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+
+    return [
+        line.decode("utf-8", errors="replace")
+        for line in buf.splitlines(keepends=True)[-lines:]
+    ]
 
 
 def activate_kill_switch():
@@ -228,30 +290,37 @@ Examples:
 """)
 
 
-if __name__ == "__main__":
-    if len(sys.argv) == 1 or "--help" in sys.argv:
-        print_usage()
-        sys.exit(0)
+def _int_arg(args: list, default: int) -> int:
+    """Optional numeric argument following a flag."""
+    return int(args[0]) if args and args[0].isdigit() else default
+
 
-    if "--stats" in sys.argv:
-        idx = sys.argv.index("--stats")
-        hours = int(sys.argv[idx + 1]) if len(sys.argv) > idx + 1 and sys.argv[idx + 1].isdigit() else 24
-        print_stats(hours)
+# Checked in this order; the first flag present wins
+COMMANDS = {
+    "--stats": lambda args: print_stats(_int_arg(args, 24)),
+    "--health": lambda args: print_health(),
+    "--logs": lambda args: print_logs(_int_arg(args, 20)),
+    "--kill": lambda args: activate_kill_switch(),
+    "--resume": lambda args: deactivate_kill_switch(),
+}
 
-    elif "--health" in sys.argv:
-        print_health()
 
-    elif "--logs" in sys.argv:
-        idx = sys.argv.index("--logs")
-        lines = int(sys.argv[idx + 1]) if len(sys.argv) > idx + 1 and sys.argv[idx + 1].isdigit() else 20
-        print_logs(lines)
+if __name__ == "__main__":
+    argv = sys.argv[1:]
 
-    elif "--kill" in sys.argv:
-        activate_kill_switch()
+    if not argv or "--help" in argv:
+        print_usage()
+        sys.exit(0)
 
-    elif "--resume" in sys.argv:
-        deactivate_kill_switch()
+    # One pass over argv: first position of each argument
+    positions = {}
+    for i, arg in enumerate(argv):
+        positions.setdefault(arg, i)
 
+    for flag, command in COMMANDS.items():
+        if flag in positions:
+            command(argv[positions[flag] + 1:])
+            break
     else:
         print_usage()
         sys.exit(1)
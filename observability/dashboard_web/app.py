@@ -4,128 +4,348 @@ Autonomous System - Web Dashboard
 Flask web interface for monitoring autonomous execution.
 """
 
-from flask import Flask, render_template_string, jsonify
+from flask import Flask, request, stream_with_context
+import functools
+import gzip
+import hashlib
+import json
 import sqlite3
+import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
+from typing import Callable, Dict, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "common"))
+
+from db import open_db, ensure_metrics_indexes, ensure_metrics_rollups, rollup_bounds
+
+try:
+    # Faster JSON encoding (pip install orjson)
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 
+# Responses smaller than this are not worth compressing
+GZIP_MIN_SIZE = 512
+GZIP_MIMETYPES = ("application/json", "text/html")
+
 METRICS_DB = Path.home() / ".claude" / "autonomous" / "metrics.db"
 KILL_SWITCH = Path.home() / ".claude" / "autonomous" / "KILL_SWITCH"
 
+# One connection for the process; the dev server runs each request on a
+# fresh thread, so per-thread or per-request connections would never be reused
+_conn = None
+_db_lock = threading.Lock()
 
-def get_db():
-    """Get database connection."""
-    return sqlite3.connect(str(METRICS_DB))
 
+def get_db() -> sqlite3.Connection:
+    """Get shared database connection (hold _db_lock while querying)."""
 
-@app.route("/")
-def index():
-    """Main dashboard page."""
-    return render_template_string(DASHBOARD_HTML)
+    global _conn
 
+    if _conn is None:
+        _conn = open_db(
+            METRICS_DB,
+            cache_size=-50000,
+            mmap_size=268435456,
+            check_same_thread=False,
+            isolation_level=None
+        )
 
-@app.route("/api/stats")
-def api_stats():
-    """API: Execution statistics."""
+        try:
+            ensure_metrics_indexes(_conn)
+            ensure_metrics_rollups(_conn)
+        except sqlite3.OperationalError:
+            # Schema not initialized yet (or read-only file): query without them
+            pass
 
-    conn = get_db()
-    cursor = conn.cursor()
+    return _conn
 
-    # Last 24h stats
-    since = (datetime.now() - timedelta(hours=24)).isoformat()
 
-    cursor.execute("""
-        SELECT
-            COUNT(*) as total,
-            AVG(sandbox_score) as avg_score,
-            COUNT(CASE WHEN status LIKE '%execute%' THEN 1 END) as executed
-        FROM execution_metrics
-        WHERE created_at > ?
-    """, (since,))
+def json_response(obj):
+    """Build a compact JSON response (orjson when installed)."""
+
+    if orjson is not None:
+        body = orjson.dumps(obj)
+    else:
+        body = json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
-    total, avg_score, executed = cursor.fetchone()
+    return app.response_class(body, mimetype="application/json")
 
-    # Risk distribution
-    cursor.execute("""
-        SELECT risk_level, COUNT(*) as count
+
+@app.after_request
+def gzip_response(response):
+    """Gzip sizeable HTML/JSON bodies for clients that accept it."""
+
+    if (response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or response.mimetype not in GZIP_MIMETYPES
+            or "Content-Encoding" in response.headers
+            or "gzip" not in request.headers.get("Accept-Encoding", "")):
+        return response
+
+    body = response.get_data()
+    if len(body) < GZIP_MIN_SIZE:
+        return response
+
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+
+    # Different bytes than the identity body: downgrade to a weak ETag,
+    # which If-None-Match still matches
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+    return response
+
+
+# Query text kept constant so the connection's statement cache always hits
+# Summed from hourly rollups plus the exact rows of the partial first hour
+_STATS_SQL = """
+    WITH recent AS (
+        SELECT status, risk_level, count, sandbox_count, sum_sandbox_score
+        FROM hourly_metrics
+        WHERE bucket > :bucket
+        UNION ALL
+        SELECT status, risk_level, 1,
+               sandbox_score IS NOT NULL, COALESCE(sandbox_score, 0)
         FROM execution_metrics
-        WHERE created_at > ?
+        WHERE created_at > :since AND created_at < :next_bucket
+    ),
+    risk AS (
+        SELECT risk_level, SUM(count) AS count
+        FROM recent
         GROUP BY risk_level
-    """, (since,))
+        HAVING SUM(count) > 0
+    )
+    SELECT
+        SUM(count) as total,
+        SUM(sum_sandbox_score) * 1.0 / SUM(sandbox_count) as avg_score,
+        SUM(CASE WHEN status LIKE '%execute%' THEN count ELSE 0 END) as executed,
+        (SELECT json_group_object(risk_level, count) FROM risk) as risk_distribution
+    FROM recent
+"""
+
+_LAST_HEARTBEAT_SQL = """
+    SELECT created_at
+    FROM system_health
+    ORDER BY created_at DESC
+    LIMIT 1
+"""
 
-    risk_dist = dict(cursor.fetchall())
+_RECENT_TASKS_SQL = """
+    SELECT task_id, task_type, risk_score, sandbox_score, status, created_at
+    FROM execution_metrics
+    ORDER BY created_at DESC
+    LIMIT 20
+"""
+
+# Every open tab polls every 5s and stats move slowly: serve cached bodies for 2s
+CACHE_TTL_SECONDS = 2
+
+# /events: change check cadence, forced refresh, and idle keepalive
+SSE_INTERVAL_SECONDS = 1
+SSE_REFRESH_SECONDS = 60
+SSE_KEEPALIVE_SECONDS = 15
+
+# (endpoint, *key) -> (stored_at, body, etag)
+_cache: Dict[tuple, Tuple[float, bytes, str]] = {}
+
+
+def cached(ttl: float, key: Callable[[], tuple] = None):
+    """
+    Cache a JSON endpoint's response body for ttl seconds.
+
+    Responses carry Cache-Control max-age and an ETag, so browsers can
+    revalidate with If-None-Match and get a bodyless 304.
+
+    Args:
+        ttl: Seconds a body stays fresh
+        key: Extra cache key parts, evaluated per request
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            cache_key = (view.__name__,) + (key() if key else ())
+            now = time.monotonic()
+
+            entry = _cache.get(cache_key)
+            if entry is None or now - entry[0] >= ttl:
+                body = view(*args, **kwargs).get_data()
+                entry = (now, body, hashlib.md5(body).hexdigest())
+                _cache[cache_key] = entry
+
+            response = app.response_class(entry[1], mimetype="application/json")
+            response.set_etag(entry[2])
+            response.cache_control.max_age = int(ttl)
+            return response.make_conditional(request)
 
-    conn.close()
+        return wrapper
 
-    return jsonify({
+    return decorator
+
+
+def _query_stats(hours: int) -> tuple:
+    """Run the stats aggregation over the last N hours."""
+
+    since = datetime.now() - timedelta(hours=hours)
+    params = dict(zip(("since", "bucket", "next_bucket"), rollup_bounds(since)))
+
+    # Totals and risk distribution in one round-trip
+    with _db_lock:
+        return get_db().execute(_STATS_SQL, params).fetchone()
+
+
+def _query_last_heartbeat():
+    """Return the latest system_health timestamp."""
+
+    with _db_lock:
+        row = get_db().execute(_LAST_HEARTBEAT_SQL).fetchone()
+
+    return row[0] if row else None
+
+
+@app.route("/")
+def index():
+    """Main dashboard page (static: all data arrives via the API)."""
+
+    response = app.response_class(_DASHBOARD_BYTES, mimetype="text/html")
+    response.set_etag(_DASHBOARD_ETAG)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
+
+
+def _stats_payload() -> dict:
+    """Execution statistics for the last 24h."""
+
+    total, avg_score, executed, risk_json = _query_stats(24)
+
+    risk_dist = json.loads(risk_json) if risk_json else {}
+
+    return {
         "total": total or 0,
         "executed": executed or 0,
         "avg_score": round(avg_score, 1) if avg_score else 0,
         "risk_distribution": risk_dist
-    })
-
+    }
 
-@app.route("/api/health")
-def api_health():
-    """API: System health."""
 
-    conn = get_db()
-    cursor = conn.cursor()
+def _health_payload() -> dict:
+    """Last heartbeat and kill switch status."""
 
     # Last heartbeat
-    cursor.execute("""
-        SELECT created_at
-        FROM system_health
-        ORDER BY created_at DESC
-        LIMIT 1
-    """)
-
-    row = cursor.fetchone()
-    last_heartbeat = row[0] if row else None
-
-    conn.close()
+    last_heartbeat = _query_last_heartbeat()
 
     # Kill switch status
     kill_switch_active = KILL_SWITCH.exists()
 
-    return jsonify({
+    return {
         "database": METRICS_DB.exists(),
         "kill_switch": kill_switch_active,
         "last_heartbeat": last_heartbeat,
         "status": "running" if not kill_switch_active else "stopped"
-    })
+    }
+
+
+def _recent_tasks_payload() -> dict:
+    """Latest 20 execution_metrics rows."""
+
+    with _db_lock:
+        cursor = get_db().execute(_RECENT_TASKS_SQL)
+        rows = cursor.fetchall()
+
+    # Selected column names are the JSON keys
+    columns = [d[0] for d in cursor.description]
+    tasks = [dict(zip(columns, row)) for row in rows]
+
+    return {"tasks": tasks}
+
+
+@app.route("/api/stats")
+@cached(CACHE_TTL_SECONDS)
+def api_stats():
+    """API: Execution statistics."""
+    return json_response(_stats_payload())
+
+
+@app.route("/api/health")
+# Kill switch state is part of the key: toggling it invalidates the entry
+@cached(CACHE_TTL_SECONDS, key=lambda: (KILL_SWITCH.exists(),))
+def api_health():
+    """API: System health."""
+    return json_response(_health_payload())
 
 
 @app.route("/api/recent_tasks")
 def api_recent_tasks():
     """API: Recent tasks."""
+    return json_response(_recent_tasks_payload())
 
-    conn = get_db()
-    cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT task_id, task_type, risk_score, sandbox_score, status, created_at
-        FROM execution_metrics
-        ORDER BY created_at DESC
-        LIMIT 20
-    """)
+def _change_signature() -> tuple:
+    """Stamps that move whenever dashboard data can change."""
+
+    # WAL commits touch metrics.db-wal, not the main file
+    state = [KILL_SWITCH.exists()]
+    for path in (METRICS_DB, METRICS_DB.with_name(METRICS_DB.name + "-wal")):
+        try:
+            st = path.stat()
+            state.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            state.append(None)
+
+    return tuple(state)
+
+
+@app.route("/events")
+def events():
+    """
+    SSE: push a full snapshot whenever it changes.
 
-    tasks = []
-    for row in cursor.fetchall():
-        tasks.append({
-            "task_id": row[0],
-            "task_type": row[1],
-            "risk_score": row[2],
-            "sandbox_score": row[3],
-            "status": row[4],
-            "created_at": row[5]
-        })
+    The database is only queried when metrics.db (or its WAL) or the kill
+    switch changed, or SSE_REFRESH_SECONDS passed so the 24h window slides.
+    """
 
-    conn.close()
+    def stream():
+        last_signature = None
+        last_body = None
+        last_query = last_send = 0.0
 
-    return jsonify({"tasks": tasks})
+        while True:
+            now = time.monotonic()
+            signature = _change_signature()
+
+            if signature != last_signature or now - last_query >= SSE_REFRESH_SECONDS:
+                last_signature, last_query = signature, now
+                body = json_response({
+                    "stats": _stats_payload(),
+                    "health": _health_payload(),
+                    **_recent_tasks_payload()
+                }).get_data(as_text=True)
+
+                if body != last_body:
+                    last_body, last_send = body, now
+                    yield f"data: {body}\n\n"
+
+            # Comment line keeps proxies from closing an idle stream
+            if now - last_send >= SSE_KEEPALIVE_SECONDS:
+                last_send = now
+                yield ": keepalive\n\n"
+
+            time.sleep(SSE_INTERVAL_SECONDS)
+
+    response = app.response_class(stream_with_context(stream()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 # HTML Template (embedded for simplicity)
@@ -199,58 +419,57 @@ DASHBOARD_HTML = """
     </div>
 
     <script>
-        function updateDashboard() {
-            // Fetch stats
-            fetch('/api/stats')
-                .then(r => r.json())
-                .then(data => {
-                    document.getElementById('total-tasks').textContent = data.total;
-                    document.getElementById('executed-tasks').textContent = data.executed;
-                    document.getElementById('avg-score').textContent = data.avg_score + '/100';
-                });
-
-            // Fetch health
-            fetch('/api/health')
-                .then(r => r.json())
-                .then(data => {
-                    const statusEl = document.getElementById('system-status');
-                    statusEl.textContent = data.status.toUpperCase();
-                    statusEl.className = 'status ' + data.status;
-                });
-
-            // Fetch recent tasks
-            fetch('/api/recent_tasks')
-                .then(r => r.json())
-                .then(data => {
-                    const tbody = document.getElementById('tasks-body');
-                    tbody.innerHTML = '';
-
-                    data.tasks.forEach(task => {
-                        const row = tbody.insertRow();
-                        row.innerHTML = `
-                            <td>${task.task_id}</td>
-                            <td>${task.task_type}</td>
-                            <td>${task.risk_score}</td>
-                            <td><span class="score ${task.sandbox_score >= 95 ? 'excellent' : task.sandbox_score >= 90 ? 'good' : 'poor'}">${task.sandbox_score || 'N/A'}</span></td>
-                            <td>${task.status}</td>
-                            <td>${new Date(task.created_at).toLocaleTimeString()}</td>
-                        `;
-                    });
-
-                    if (data.tasks.length === 0) {
-                        tbody.innerHTML = '<tr><td colspan="6" style="text-align:center;color:#888;">No tasks yet</td></tr>';
-                    }
-                });
+        function renderStats(data) {
+            document.getElementById('total-tasks').textContent = data.total;
+            document.getElementById('executed-tasks').textContent = data.executed;
+            document.getElementById('avg-score').textContent = data.avg_score + '/100';
         }
 
-        // Update every 5 seconds
-        updateDashboard();
-        setInterval(updateDashboard, 5000);
+        function renderHealth(data) {
+            const statusEl = document.getElementById('system-status');
+            statusEl.textContent = data.status.toUpperCase();
+            statusEl.className = 'status ' + data.status;
+        }
+
+        function renderTasks(data) {
+            const tbody = document.getElementById('tasks-body');
+            tbody.innerHTML = '';
+
+            data.tasks.forEach(task => {
+                const row = tbody.insertRow();
+                row.innerHTML = `
+                    <td>${task.task_id}</td>
+                    <td>${task.task_type}</td>
+                    <td>${task.risk_score}</td>
+                    <td><span class="score ${task.sandbox_score >= 95 ? 'excellent' : task.sandbox_score >= 90 ? 'good' : 'poor'}">${task.sandbox_score || 'N/A'}</span></td>
+                    <td>${task.status}</td>
+                    <td>${new Date(task.created_at).toLocaleTimeString()}</td>
+                `;
+            });
+
+            if (data.tasks.length === 0) {
+                tbody.innerHTML = '<tr><td colspan="6" style="text-align:center;color:#888;">No tasks yet</td></tr>';
+            }
+        }
+
+        // Server pushes a snapshot only when something changed
+        // (EventSource reconnects on its own if the stream drops)
+        const events = new EventSource('/events');
+        events.onmessage = (e) => {
+            const data = JSON.parse(e.data);
+            renderStats(data.stats);
+            renderHealth(data.health);
+            renderTasks(data);
+        };
     </script>
 </body>
 </html>
 """
 
+# Encoded once; the page has no template variables, so Jinja is skipped
+_DASHBOARD_BYTES = DASHBOARD_HTML.encode("utf-8")
+_DASHBOARD_ETAG = hashlib.md5(_DASHBOARD_BYTES).hexdigest()
+
 
 if __name__ == "__main__":
     print("Starting Autonomous System Web Dashboard")
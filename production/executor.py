@@ -5,16 +5,20 @@ Safe production execution with automatic rollback on failure.
 """
 
 import os
+import threading
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, FrozenSet, Tuple, Optional
 
 # Add paths
 sys.path.insert(0, str(Path(__file__).parent))
 sys.path.insert(0, str(Path(__file__).parent.parent / "sandbox"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
 
 import sqlite3
+from db import open_db, build_update_sql, load_schema, check_identifiers
 from snapshot_manager import SnapshotManager
 from rollback_manager import RollbackManager
 from validation.pre_flight import PreFlightValidator
@@ -23,6 +27,14 @@ from validation.post_flight import PostFlightValidator
 # Workspace path
 WORKSPACE_ROOT = Path(os.environ.get("CW_ROOT", str(Path.home() / "Library" / "CloudStorage" / "OneDrive-SAPASPA" / "OD PARA Sales Strategy" / "Claude Workspace")))
 LOCAL_VAULT_DB = WORKSPACE_ROOT / "local_vault.db"
+WORKDIR = WORKSPACE_ROOT / "workdir"
+
+# Parent directories already created by write_file, skips repeat mkdir stats
+_known_dirs = set()
+
+# Snapshot/restore copy local_vault.db whole, so executions that touch the
+# workspace must not overlap across threads (pre-flight still runs in parallel)
+_workspace_lock = threading.Lock()
 
 
 class ProductionExecutor:
@@ -42,6 +54,45 @@ class ProductionExecutor:
         self.rollback_manager = RollbackManager()
         self.pre_flight_validator = PreFlightValidator()
         self.post_flight_validator = PostFlightValidator()
+        # local_vault.db connection reused across tasks, opened on first use
+        self._vault = None
+        # (schema_version, load_schema()) for the vault connection
+        self._vault_schema = None
+
+    def _vault_conn(self) -> sqlite3.Connection:
+        """Return the persistent vault connection."""
+
+        if self._vault is None:
+            # No WAL: snapshots copy local_vault.db as a single file
+            self._vault = open_db(
+                LOCAL_VAULT_DB,
+                wal=False,
+                cache_size=-50000,
+                mmap_size=268435456,
+                check_same_thread=False
+            )
+
+        return self._vault
+
+    def _schema(self, conn: sqlite3.Connection) -> Dict[str, FrozenSet[str]]:
+        """Vault tables and columns, reloaded when the schema changes."""
+
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        if self._vault_schema is None or self._vault_schema[0] != version:
+            self._vault_schema = (version, load_schema(conn))
+
+        return self._vault_schema[1]
+
+    def close(self):
+        """Close the vault connections (reopened on next use)."""
+
+        if self._vault is not None:
+            self._vault.close()
+            self._vault = None
+            self._vault_schema = None
+
+        self.pre_flight_validator.close()
+        self.post_flight_validator.close()
 
     def execute(self, task: Dict[str, Any]) -> Tuple[bool, Any, str, Optional[str]]:
         """
@@ -59,8 +110,6 @@ class ProductionExecutor:
         print(f"Production Execution: {task_id}")
         print(f"{'='*60}")
 
-        snapshot_id = None
-
         # Step 1: Pre-flight validation
         print("\n[1/5] Pre-flight Validation")
         pre_flight_passed, pre_flight_issues = self.pre_flight_validator.validate(task)
@@ -70,6 +119,15 @@ class ProductionExecutor:
             print(f"\n✗ Execution aborted: {error}")
             return False, None, error, None
 
+        # Steps 2-5 snapshot, change and possibly restore the shared workspace
+        with _workspace_lock:
+            return self._execute_with_snapshot(task)
+
+    def _execute_with_snapshot(self, task: Dict[str, Any]) -> Tuple[bool, Any, str, Optional[str]]:
+        """Snapshot, execute, post-flight validate and roll back if needed."""
+
+        snapshot_id = None
+
         # Step 2: Create snapshot
         print("\n[2/5] Creating Snapshot")
         try:
@@ -110,6 +168,8 @@ class ProductionExecutor:
         # Step 5: Rollback if needed
         if not success or not post_flight_passed:
             print("\n[5/5] Rollback")
+            # Restore overwrites the vault file in place; drop our mappings first
+            self.close()
             rollback_reason = error if error else f"Post-flight validation failed: {'; '.join(post_flight_issues)}"
 
             rollback_success = self.rollback_manager.rollback(
@@ -172,32 +232,31 @@ class ProductionExecutor:
             return False, None, str(e)
 
     def _execute_query_db(self, payload: Dict[str, Any]) -> Tuple[bool, Any, str]:
-        """Execute database query."""
+        """Execute read-only database query with bound parameters."""
 
         query = payload.get("query")
+        params = payload.get("params", [])
         if not query:
             return False, None, "Missing query in payload"
 
+        # Writes go through update_db, which builds its own parameterized SQL
+        if query.lstrip()[:6].upper() != "SELECT":
+            return False, None, "query_db only runs SELECT queries; use update_db for writes"
+
         try:
-            conn = sqlite3.connect(str(LOCAL_VAULT_DB))
-            cursor = conn.cursor()
-            cursor.execute(query)
-
-            if query.strip().upper().startswith("SELECT"):
-                results = cursor.fetchall()
-                conn.close()
-                return True, results, ""
-            else:
-                conn.commit()
-                affected = cursor.rowcount
-                conn.close()
-                return True, {"affected_rows": affected}, ""
+            results = self._vault_conn().execute(query, params).fetchall()
+            return True, results, ""
 
         except sqlite3.Error as e:
             return False, None, f"Database error: {e}"
 
     def _execute_update_db(self, payload: Dict[str, Any]) -> Tuple[bool, Any, str]:
-        """Execute database update."""
+        """
+        Execute database update.
+
+        updates/conditions are either single dicts, or equal-length lists of
+        dicts with the same keys for a bulk update run as one executemany.
+        """
 
         table = payload.get("table")
         updates = payload.get("updates", {})
@@ -206,19 +265,49 @@ class ProductionExecutor:
         if not table or not updates:
             return False, None, "Missing table or updates in payload"
 
-        set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
-        where_clause = " AND ".join([f"{k} = ?" for k in conditions.keys()]) if conditions else "1=1"
+        # Normalize to row lists; a single update is a batch of one
+        bulk = isinstance(updates, list)
+        rows = updates if bulk else [updates]
+        if bulk:
+            row_conditions = conditions if isinstance(conditions, list) else [conditions] * len(rows)
+        else:
+            row_conditions = [conditions]
+
+        if len(row_conditions) != len(rows):
+            return False, None, "Bulk update needs one conditions entry per update"
 
-        query = f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
-        values = list(updates.values()) + list(conditions.values())
+        # SQL is built once from the first row; every row must share its shape
+        update_keys = list(rows[0].keys())
+        condition_keys = list(row_conditions[0].keys()) if row_conditions[0] else []
+        if any(list(u.keys()) != update_keys or list((c or {}).keys()) != condition_keys
+               for u, c in zip(rows, row_conditions)):
+            return False, None, "Bulk update rows must share the same update and condition keys"
+
+        # Without conditions every bulk row would be WHERE 1=1, rewriting the whole table
+        if bulk and not condition_keys:
+            return False, None, "Bulk update needs conditions for every row"
 
         try:
-            conn = sqlite3.connect(str(LOCAL_VAULT_DB))
-            cursor = conn.cursor()
-            cursor.execute(query, values)
-            conn.commit()
+            conn = self._vault_conn()
+
+            # Table and column names are interpolated, so they must exist in the vault
+            error = check_identifiers(self._schema(conn), table, update_keys + condition_keys)
+            if error:
+                return False, None, f"Database error: {error}"
+
+            query = build_update_sql(table, tuple(update_keys), tuple(condition_keys))
+            values = [
+                tuple(u.values()) + tuple((c or {}).values())
+                for u, c in zip(rows, row_conditions)
+            ]
+
+            # Commits on success, rolls back on error
+            with conn:
+                if bulk:
+                    cursor = conn.executemany(query, values)
+                else:
+                    cursor = conn.execute(query, values[0])
             affected = cursor.rowcount
-            conn.close()
 
             return True, {"affected_rows": affected}, ""
 
@@ -234,12 +323,17 @@ class ProductionExecutor:
         if not file_path or content is None:
             return False, None, "Missing file_path or content in payload"
 
-        full_path = WORKSPACE_ROOT / "workdir" / Path(file_path).name
-        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path = WORKDIR / Path(file_path).name
+        if full_path.parent not in _known_dirs:
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            _known_dirs.add(full_path.parent)
 
         try:
-            with open(full_path, "w") as f:
+            # Write then rename, so hard-linked snapshot backups keep the old inode
+            staged = full_path.with_name(f".{full_path.name}.tmp")
+            with open(staged, "w") as f:
                 f.write(content)
+            os.replace(staged, full_path)
 
             return True, {"bytes_written": len(content), "path": str(full_path)}, ""
 
@@ -268,47 +362,47 @@ class ProductionExecutor:
 
 # CLI test
 if __name__ == "__main__":
-    executor = ProductionExecutor()
-
     print("="*60)
     print("Production Executor Test Suite")
     print("="*60)
 
-    # Test 1: Successful execution
-    print("\n\nTEST 1: Successful Query Execution")
+    test_tasks = [
+        # Test 1: Successful execution
+        {
+            "task_id": "prod_test_1",
+            "action_type": "query_db",
+            "payload": {
+                "query": "SELECT COUNT(*) FROM entities",
+                "expected_result": "integer"
+            }
+        },
+        # Test 2: Failed execution with rollback (invalid query)
+        {
+            "task_id": "prod_test_2",
+            "action_type": "query_db",
+            "payload": {
+                "query": "SELECT * FROM nonexistent_table_xyz"
+            }
+        }
+    ]
+
+    print("\n\nTESTS 1-2: Successful Query + Failed Execution (Invalid Query)")
     print("-"*60)
 
-    test_task_1 = {
-        "task_id": "prod_test_1",
-        "action_type": "query_db",
-        "payload": {
-            "query": "SELECT COUNT(*) FROM entities",
-            "expected_result": "integer"
-        }
-    }
+    # One executor per task, so each keeps its own vault connection
+    executors = [ProductionExecutor() for _ in test_tasks]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(ProductionExecutor.execute, executors, test_tasks))
+    for task_executor in executors:
+        task_executor.close()
 
-    success1, result1, error1, snapshot1 = executor.execute(test_task_1)
+    (success1, result1, error1, snapshot1), (success2, result2, error2, snapshot2) = results
 
     if success1:
         print(f"\n✓ Test 1 PASSED")
     else:
         print(f"\n✗ Test 1 FAILED: {error1}")
 
-    # Test 2: Failed execution with rollback
-    print("\n\n" + "="*60)
-    print("TEST 2: Failed Execution (Invalid Query)")
-    print("-"*60)
-
-    test_task_2 = {
-        "task_id": "prod_test_2",
-        "action_type": "query_db",
-        "payload": {
-            "query": "SELECT * FROM nonexistent_table_xyz"
-        }
-    }
-
-    success2, result2, error2, snapshot2 = executor.execute(test_task_2)
-
     if not success2 and "rolled back" in error2:
         print(f"\n✓ Test 2 PASSED (correctly failed and rolled back)")
     else:
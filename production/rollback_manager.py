@@ -5,11 +5,33 @@ Handles automatic rollback on execution failures.
 """
 
 import json
+import sqlite3
+import sys
 from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
-from snapshot_manager import SnapshotManager
+sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
+
+from db import open_db, VAULT_DB_OPTIONS, ROLLBACK_EVENTS_TABLE
+from snapshot_manager import SnapshotManager, LOCAL_VAULT_DB
+
+METRICS_DB = Path.home() / ".claude" / "autonomous" / "metrics.db"
+# Pre-table JSON-lines history, imported into rollback_events once
+LEGACY_ROLLBACK_LOG = Path.home() / ".claude" / "autonomous" / "logs" / "rollbacks.log"
+
+_INSERT_ROLLBACK_SQL = """
+    INSERT INTO rollback_events
+    (snapshot_id, reason, success, task_id, task_type, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_ROLLBACK_HISTORY_SQL = """
+    SELECT created_at, snapshot_id, reason, success, task_id, task_type
+    FROM rollback_events
+    ORDER BY id DESC
+    LIMIT ?
+"""
 
 
 class RollbackManager:
@@ -17,8 +39,61 @@ class RollbackManager:
 
     def __init__(self):
         self.snapshot_manager = SnapshotManager()
-        self.rollback_log = Path.home() / ".claude" / "autonomous" / "logs" / "rollbacks.log"
-        self.rollback_log.parent.mkdir(parents=True, exist_ok=True)
+        # metrics.db connection for rollback_events, opened on first use
+        self._events_conn = None
+
+    def _events_db(self) -> sqlite3.Connection:
+        """Return the rollback_events connection, creating the table once."""
+
+        if self._events_conn is None:
+            METRICS_DB.parent.mkdir(parents=True, exist_ok=True)
+            self._events_conn = open_db(METRICS_DB)
+            self._events_conn.execute(ROLLBACK_EVENTS_TABLE)
+            self._import_legacy_log(self._events_conn)
+
+        return self._events_conn
+
+    def _import_legacy_log(self, conn: sqlite3.Connection):
+        """
+        Move rollbacks.log entries into rollback_events.
+
+        Runs only while the table is still empty; the log is renamed to
+        rollbacks.log.imported afterwards so it is never imported twice.
+        """
+
+        if not LEGACY_ROLLBACK_LOG.exists():
+            return
+        if conn.execute("SELECT 1 FROM rollback_events LIMIT 1").fetchone():
+            return
+
+        rows = []
+        with open(LEGACY_ROLLBACK_LOG, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                rows.append((
+                    entry.get("snapshot_id"),
+                    entry.get("reason"),
+                    bool(entry.get("success")),
+                    entry.get("task_id"),
+                    entry.get("task_type"),
+                    entry.get("timestamp")
+                ))
+
+        with conn:
+            conn.executemany(_INSERT_ROLLBACK_SQL, rows)
+
+        LEGACY_ROLLBACK_LOG.rename(LEGACY_ROLLBACK_LOG.with_name("rollbacks.log.imported"))
+        print(f"[Rollback] Imported {len(rows)} entries from {LEGACY_ROLLBACK_LOG.name}")
+
+    def close(self):
+        """Close the rollback_events connection (reopened on next use)."""
+
+        if self._events_conn is not None:
+            self._events_conn.close()
+            self._events_conn = None
 
     def rollback(
         self,
@@ -72,15 +147,9 @@ class RollbackManager:
             True if verification passed
         """
 
-        # Basic verification: check if database is accessible
-        from pathlib import Path
-        import sqlite3
-
-        workspace_root = Path.home() / "Library" / "CloudStorage" / "OneDrive-SAPASPA" / "OD PARA Sales Strategy" / "Claude Workspace"
-        db_path = workspace_root / "local_vault.db"
-
+        # Basic verification: check if the restored database is accessible
         try:
-            conn = sqlite3.connect(str(db_path))
+            conn = open_db(LOCAL_VAULT_DB, readonly=True, **VAULT_DB_OPTIONS)
             cursor = conn.cursor()
 
             # Simple query to verify DB integrity
@@ -109,34 +178,36 @@ class RollbackManager:
     ):
         """Log rollback event."""
 
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "snapshot_id": snapshot_id,
-            "reason": reason,
-            "success": success,
-            "task_id": task.get("task_id") if task else None,
-            "task_type": task.get("action_type") if task else None
-        }
-
-        with open(self.rollback_log, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        conn = self._events_db()
+        with conn:
+            conn.execute(_INSERT_ROLLBACK_SQL, (
+                snapshot_id,
+                reason,
+                success,
+                task.get("task_id") if task else None,
+                task.get("action_type") if task else None,
+                datetime.now().isoformat()
+            ))
 
     def get_rollback_history(self, limit: int = 10) -> list:
-        """Get recent rollback history."""
+        """Get recent rollback history, newest first."""
 
-        if not self.rollback_log.exists():
+        if limit <= 0:
             return []
 
-        history = []
-        with open(self.rollback_log, "r") as f:
-            lines = f.readlines()
-            for line in lines[-limit:]:
-                try:
-                    history.append(json.loads(line))
-                except json.JSONDecodeError:
-                    pass
-
-        return list(reversed(history))
+        rows = self._events_db().execute(_ROLLBACK_HISTORY_SQL, (limit,)).fetchall()
+
+        return [
+            {
+                "timestamp": created_at,
+                "snapshot_id": snapshot_id,
+                "reason": reason,
+                "success": bool(success),
+                "task_id": task_id,
+                "task_type": task_type
+            }
+            for created_at, snapshot_id, reason, success, task_id, task_type in rows
+        ]
 
 
 # CLI test
@@ -4,20 +4,77 @@ Autonomous System - Snapshot Manager
 Creates and manages backups for safe production execution.
 """
 
+import errno
+import heapq
 import json
 import os
 import shutil
 import sqlite3
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
+try:
+    # Faster JSON encoding/decoding (pip install orjson), emits bytes directly
+    import orjson
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+    json_loads = json.loads
+
 
 # Paths
 SNAPSHOT_ROOT = Path.home() / ".claude" / "autonomous" / "snapshots"
 WORKSPACE_ROOT = Path(os.environ.get("CW_ROOT", str(Path.home() / "Library" / "CloudStorage" / "OneDrive-SAPASPA" / "OD PARA Sales Strategy" / "Claude Workspace")))
 LOCAL_VAULT_DB = WORKSPACE_ROOT / "local_vault.db"
+_LOCAL_VAULT_DB_STR = str(LOCAL_VAULT_DB)
+
+# Per-file backup/restore copies are independent I/O that releases the GIL
+FILE_COPY_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# copy_file_range errors meaning "not here", handled by the shutil fallback
+_COPY_RANGE_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP}
+
+
+def _fast_copy(src: Path, dst: Path):
+    """
+    Copy a file in the kernel and preserve its metadata (like shutil.copy2).
+
+    os.copy_file_range (Linux) lets the filesystem reflink or copy without
+    a userspace buffer; elsewhere shutil.copyfile already dispatches to
+    fcopyfile (macOS) or sendfile.
+    """
+
+    if hasattr(os, "copy_file_range"):
+        src_fd = os.open(src, os.O_RDONLY)
+        try:
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                remaining = os.fstat(src_fd).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                shutil.copystat(src, dst)
+                return
+            except OSError as e:
+                if e.errno not in _COPY_RANGE_FALLBACK_ERRNOS:
+                    raise
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+
+    shutil.copy2(src, dst)
 
 
 class SnapshotManager:
@@ -52,13 +109,15 @@ class SnapshotManager:
             "task_id": task.get("task_id"),
             "task_type": task.get("action_type"),
             "created_at": datetime.now().isoformat(),
-            "affected_files": [str(f) for f in (affected_files or [])]
+            "affected_files": [str(f) for f in (affected_files or [])],
+            # Relative path -> "hardlink" or "copy", read back by restore
+            "file_backups": {}
         }
 
         # Always backup database
         try:
             db_backup = snapshot_path / "local_vault.db"
-            shutil.copy2(LOCAL_VAULT_DB, db_backup)
+            self._backup_database(db_backup)
             metadata["database_backup"] = str(db_backup)
         except Exception as e:
             print(f"[Snapshot] Warning: Could not backup database: {e}")
@@ -69,24 +128,108 @@ class SnapshotManager:
             files_dir = snapshot_path / "files"
             files_dir.mkdir(exist_ok=True)
 
-            for file_path in affected_files:
-                if file_path.exists():
+            with ThreadPoolExecutor(max_workers=FILE_COPY_WORKERS) as pool:
+                futures = {}
+                for file_path in affected_files:
+                    if file_path.exists():
+                        try:
+                            # Preserve directory structure
+                            relative = file_path.relative_to(WORKSPACE_ROOT)
+                            backup_path = files_dir / relative
+                            backup_path.parent.mkdir(parents=True, exist_ok=True)
+                        except Exception as e:
+                            print(f"[Snapshot] Warning: Could not backup {file_path}: {e}")
+                            continue
+                        future = pool.submit(self._backup_file, file_path, backup_path)
+                        futures[future] = (file_path, relative)
+
+                for future in as_completed(futures):
+                    file_path, relative = futures[future]
                     try:
-                        # Preserve directory structure
-                        relative = file_path.relative_to(WORKSPACE_ROOT)
-                        backup_path = files_dir / relative
-                        backup_path.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(file_path, backup_path)
+                        metadata["file_backups"][str(relative)] = future.result()
                     except Exception as e:
                         print(f"[Snapshot] Warning: Could not backup {file_path}: {e}")
 
         # Save metadata
-        with open(snapshot_path / "metadata.json", "w") as f:
-            json.dump(metadata, f, indent=2)
+        with open(snapshot_path / "metadata.json", "wb") as f:
+            f.write(json_dumps(metadata))
 
         print(f"[Snapshot] Created snapshot: {snapshot_id}")
         return snapshot_id
 
+    def _backup_database(self, db_backup: Path):
+        """
+        Copy local_vault.db with SQLite's online backup API.
+
+        Unlike a file copy, the backup is a consistent point-in-time image
+        even if another process writes to the vault mid-copy (SQLite
+        restarts the copy instead of tearing it).
+        """
+
+        # sqlite3.connect would silently create an empty vault
+        if not os.path.exists(_LOCAL_VAULT_DB_STR):
+            raise FileNotFoundError(f"Database not found: {LOCAL_VAULT_DB}")
+
+        src = sqlite3.connect(_LOCAL_VAULT_DB_STR)
+        try:
+            dst = sqlite3.connect(str(db_backup))
+            try:
+                # Copy in 1024-page steps, releasing the read lock between steps
+                src.backup(dst, pages=1024)
+            finally:
+                dst.close()
+        finally:
+            src.close()
+
+    def _backup_file(self, file_path: Path, backup_path: Path) -> str:
+        """
+        Back up a workspace file, hard-linking it when possible.
+
+        A hard link keeps the original inode, which stays intact as long as
+        writers replace the file (write + os.replace) rather than truncate it.
+        Cross-device links (the snapshot root is outside OneDrive) or
+        filesystems without link support fall back to a copy.
+
+        Returns:
+            "hardlink" or "copy"
+        """
+
+        try:
+            os.link(file_path, backup_path)
+            return "hardlink"
+        except OSError:
+            _fast_copy(file_path, backup_path)
+            return "copy"
+
+    def _restore_file(self, backup_file: Path, target: Path, link_mode: str):
+        """Put a backed-up file back in place."""
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staged = target.with_name(f".{target.name}.restore")
+
+        if link_mode == "hardlink":
+            # Untouched since the snapshot: target is still the linked inode
+            if target.exists() and os.path.samefile(backup_file, target):
+                return
+
+            # Swap in a fresh link atomically, keeping the snapshot copy
+            try:
+                if staged.exists():
+                    staged.unlink()
+                os.link(backup_file, staged)
+                os.replace(staged, target)
+                return
+            except OSError:
+                pass
+
+        # Never copy into target in place: after a hardlink restore its inode
+        # is shared with an earlier snapshot's backup, so truncating it would
+        # rewrite that snapshot. Copy to a staged file and swap it in instead.
+        if staged.exists():
+            staged.unlink()
+        _fast_copy(backup_file, staged)
+        os.replace(staged, target)
+
     def restore_snapshot(self, snapshot_id: str) -> bool:
         """
         Restore from snapshot.
@@ -105,8 +248,8 @@ class SnapshotManager:
             return False
 
         # Load metadata
-        with open(snapshot_path / "metadata.json", "r") as f:
-            metadata = json.load(f)
+        with open(snapshot_path / "metadata.json", "rb") as f:
+            metadata = json_loads(f.read())
 
         print(f"[Snapshot] Restoring snapshot {snapshot_id}...")
 
@@ -114,7 +257,7 @@ class SnapshotManager:
         db_backup = snapshot_path / "local_vault.db"
         if db_backup.exists():
             try:
-                shutil.copy2(db_backup, LOCAL_VAULT_DB)
+                _fast_copy(db_backup, LOCAL_VAULT_DB)
                 print(f"[Snapshot]   ✓ Database restored")
             except Exception as e:
                 print(f"[Snapshot]   ✗ Database restore failed: {e}")
@@ -123,13 +266,21 @@ class SnapshotManager:
         # Restore files
         files_dir = snapshot_path / "files"
         if files_dir.exists():
-            for backup_file in files_dir.rglob("*"):
-                if backup_file.is_file():
-                    try:
+            file_backups = metadata.get("file_backups", {})
+            with ThreadPoolExecutor(max_workers=FILE_COPY_WORKERS) as pool:
+                futures = {}
+                for backup_file in files_dir.rglob("*"):
+                    if backup_file.is_file():
                         relative = backup_file.relative_to(files_dir)
                         target = WORKSPACE_ROOT / relative
-                        target.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(backup_file, target)
+                        link_mode = file_backups.get(str(relative), "copy")
+                        future = pool.submit(self._restore_file, backup_file, target, link_mode)
+                        futures[future] = relative
+
+                for future in as_completed(futures):
+                    relative = futures[future]
+                    try:
+                        future.result()
                         print(f"[Snapshot]   ✓ Restored: {relative}")
                     except Exception as e:
                         print(f"[Snapshot]   ✗ Failed to restore {relative}: {e}")
@@ -148,14 +299,20 @@ class SnapshotManager:
             List of snapshot metadata
         """
 
-        snapshots = []
+        # Snapshot IDs are random, so recency comes from the directory mtime
+        with os.scandir(SNAPSHOT_ROOT) as entries:
+            dated = [
+                (entry.stat(follow_symlinks=False).st_mtime, entry.path)
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+            ]
 
-        for snapshot_dir in sorted(SNAPSHOT_ROOT.iterdir(), reverse=True)[:limit]:
-            if snapshot_dir.is_dir():
-                metadata_file = snapshot_dir / "metadata.json"
-                if metadata_file.exists():
-                    with open(metadata_file, "r") as f:
-                        snapshots.append(json.load(f))
+        snapshots = []
+        for _, snapshot_dir in heapq.nlargest(limit, dated):
+            metadata_file = os.path.join(snapshot_dir, "metadata.json")
+            if os.path.exists(metadata_file):
+                with open(metadata_file, "rb") as f:
+                    snapshots.append(json_loads(f.read()))
 
         return snapshots
 
@@ -170,21 +327,24 @@ class SnapshotManager:
             Number of snapshots removed
         """
 
-        cutoff = datetime.now() - timedelta(days=days)
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
         removed = 0
 
-        for snapshot_dir in SNAPSHOT_ROOT.iterdir():
-            if snapshot_dir.is_dir():
-                metadata_file = snapshot_dir / "metadata.json"
-                if metadata_file.exists():
-                    with open(metadata_file, "r") as f:
-                        metadata = json.load(f)
-
-                    created = datetime.fromisoformat(metadata["created_at"])
-                    if created < cutoff:
-                        shutil.rmtree(snapshot_dir)
-                        removed += 1
-                        print(f"[Snapshot] Removed old snapshot: {snapshot_dir.name}")
+        # metadata.json is the last file written into a snapshot, so the
+        # directory mtime is never earlier than created_at: a stale mtime
+        # proves the snapshot is old without parsing its metadata
+        with os.scandir(SNAPSHOT_ROOT) as entries:
+            stale = [
+                entry for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+                and entry.stat(follow_symlinks=False).st_mtime < cutoff
+            ]
+
+        for entry in stale:
+            if os.path.exists(os.path.join(entry.path, "metadata.json")):
+                shutil.rmtree(entry.path)
+                removed += 1
+                print(f"[Snapshot] Removed old snapshot: {entry.name}")
 
         return removed
 
@@ -195,8 +355,8 @@ class SnapshotManager:
         metadata_file = snapshot_path / "metadata.json"
 
         if metadata_file.exists():
-            with open(metadata_file, "r") as f:
-                return json.load(f)
+            with open(metadata_file, "rb") as f:
+                return json_loads(f.read())
 
         return None
 
@@ -7,14 +7,32 @@ Validates results after production execution.
 import json
 import os
 import sqlite3
+import sys
+import time
+from collections import namedtuple
 from pathlib import Path
 from typing import Dict, Any, Tuple, List
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "common"))
+
+from db import open_db, VAULT_DB_OPTIONS
+
 
 # Paths
 WORKSPACE_ROOT = Path(os.environ.get("CW_ROOT", str(Path.home() / "Library" / "CloudStorage" / "OneDrive-SAPASPA" / "OD PARA Sales Strategy" / "Claude Workspace")))
 LOCAL_VAULT_DB = WORKSPACE_ROOT / "local_vault.db"
 
+# Marker whose mtime records the last full integrity_check of the vault
+INTEGRITY_MARKER = Path.home() / ".claude" / "autonomous" / "LAST_INTEGRITY_CHECK"
+FULL_CHECK_INTERVAL_SECONDS = 3600
+FULL_CHECK_ACTIONS = {"update_db", "delete_db"}
+
+# AUTONOMOUS_QUIET=1 drops passing post-flight lines; failures are always shown
+QUIET = os.environ.get("AUTONOMOUS_QUIET") == "1"
+
+# One probe of the vault per validate(); the database checks read from it
+VaultProbe = namedtuple("VaultProbe", ["integrity", "table_count", "error"])
+
 
 class PostFlightValidator:
     """Validates execution results and system state."""
@@ -25,6 +43,35 @@ class PostFlightValidator:
             self._check_expected_changes,
             self._check_no_corruption,
         ]
+        # Read-only actions cannot damage the vault, so skip the database probes
+        self._checks_by_action = {
+            "query_db": [self._check_expected_changes],
+            "read_file": [self._check_expected_changes],
+        }
+        # local_vault.db connection shared by the database checks, opened on first use
+        self._conn = None
+        self._probe = None
+
+    def _vault_conn(self) -> sqlite3.Connection:
+        """Return the persistent vault connection."""
+
+        if self._conn is None:
+            # Post-flight only reads: integrity check and table count
+            self._conn = open_db(
+                LOCAL_VAULT_DB,
+                readonly=True,
+                check_same_thread=False,
+                **VAULT_DB_OPTIONS
+            )
+
+        return self._conn
+
+    def close(self):
+        """Close the vault connection (reopened on next use)."""
+
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
     def validate(
         self,
@@ -44,37 +91,90 @@ class PostFlightValidator:
             Tuple of (all_passed, issues)
         """
 
-        print("[Post-flight] Running validation checks...")
+        # (passed, line) pairs, written in one go when validation finishes
+        report = [(True, "[Post-flight] Running validation checks...")]
         issues = []
+        self._probe = None
 
         # If task failed with error, that's already a validation failure
         if error:
             issues.append(f"Task execution error: {error}")
-            print(f"[Post-flight]   ✗ Task failed: {error}")
+            report.append((False, f"[Post-flight]   ✗ Task failed: {error}"))
+            _print_report(report)
             return False, issues
 
-        for check in self.checks:
+        for check in self._checks_by_action.get(task.get("action_type"), self.checks):
             try:
                 passed, message = check(task, result)
                 if passed:
-                    print(f"[Post-flight]   ✓ {message}")
+                    report.append((True, f"[Post-flight]   ✓ {message}"))
                 else:
-                    print(f"[Post-flight]   ✗ {message}")
+                    report.append((False, f"[Post-flight]   ✗ {message}"))
                     issues.append(message)
             except Exception as e:
                 error_msg = f"{check.__name__}: {e}"
-                print(f"[Post-flight]   ✗ {error_msg}")
+                report.append((False, f"[Post-flight]   ✗ {error_msg}"))
                 issues.append(error_msg)
 
         all_passed = len(issues) == 0
 
         if all_passed:
-            print("[Post-flight] ✓ All checks passed")
+            report.append((True, "[Post-flight] ✓ All checks passed"))
         else:
-            print(f"[Post-flight] ✗ {len(issues)} check(s) failed")
+            report.append((False, f"[Post-flight] ✗ {len(issues)} check(s) failed"))
 
+        _print_report(report)
         return all_passed, issues
 
+    def _needs_full_check(self, task: Dict[str, Any]) -> bool:
+        """Full integrity_check only after writes, at most once per interval."""
+
+        if task.get("action_type") not in FULL_CHECK_ACTIONS:
+            return False
+
+        try:
+            age = time.time() - INTEGRITY_MARKER.stat().st_mtime
+        except FileNotFoundError:
+            return True
+
+        return age >= FULL_CHECK_INTERVAL_SECONDS
+
+    def _run_db_probe(self, task: Dict[str, Any]) -> VaultProbe:
+        """
+        Run integrity check and table count in one read transaction.
+
+        quick_check skips the index/content cross-checks that make
+        integrity_check read every page; the full check is kept for
+        write tasks when the last one is older than the interval.
+        """
+
+        if self._probe is not None:
+            return self._probe
+
+        full_check = self._needs_full_check(task)
+        pragma = "PRAGMA integrity_check(16)" if full_check else "PRAGMA quick_check(16)"
+
+        conn = self._vault_conn()
+        try:
+            conn.execute("BEGIN")
+            # Up to 16 error rows, or a single "ok"
+            integrity = "; ".join(row[0] for row in conn.execute(pragma).fetchall())
+            table_count = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type='table'"
+            ).fetchone()[0]
+            self._probe = VaultProbe(integrity, table_count, None)
+
+            if full_check and integrity == "ok":
+                INTEGRITY_MARKER.parent.mkdir(parents=True, exist_ok=True)
+                INTEGRITY_MARKER.touch()
+        except sqlite3.Error as e:
+            self._probe = VaultProbe(None, None, str(e))
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+        return self._probe
+
     def _check_database_integrity(
         self,
         task: Dict[str, Any],
@@ -82,23 +182,14 @@ class PostFlightValidator:
     ) -> Tuple[bool, str]:
         """Check database integrity after execution."""
 
-        try:
-            conn = sqlite3.connect(str(LOCAL_VAULT_DB))
-            cursor = conn.cursor()
-
-            # SQLite integrity check
-            cursor.execute("PRAGMA integrity_check")
-            integrity_result = cursor.fetchone()[0]
+        probe = self._run_db_probe(task)
+        if probe.error:
+            return False, f"Database integrity check error: {probe.error}"
 
-            conn.close()
-
-            if integrity_result == "ok":
-                return True, "Database integrity OK"
-            else:
-                return False, f"Database integrity check failed: {integrity_result}"
-
-        except sqlite3.Error as e:
-            return False, f"Database integrity check error: {e}"
+        if probe.integrity == "ok":
+            return True, "Database integrity OK"
+        else:
+            return False, f"Database integrity check failed: {probe.integrity}"
 
     def _check_expected_changes(
         self,
@@ -151,23 +242,23 @@ class PostFlightValidator:
         """Check for signs of data corruption."""
 
         # Check database table count hasn't changed unexpectedly
-        try:
-            conn = sqlite3.connect(str(LOCAL_VAULT_DB))
-            cursor = conn.cursor()
+        probe = self._run_db_probe(task)
+        if probe.error:
+            return False, f"Corruption check failed: {probe.error}"
 
-            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table'")
-            table_count = cursor.fetchone()[0]
+        # Expected minimum tables (entities, documents, tasks, etc.)
+        if probe.table_count >= 5:
+            return True, f"Database structure intact ({probe.table_count} tables)"
+        else:
+            return False, f"Database may be corrupted (only {probe.table_count} tables)"
 
-            conn.close()
 
-            # Expected minimum tables (entities, documents, tasks, etc.)
-            if table_count >= 5:
-                return True, f"Database structure intact ({table_count} tables)"
-            else:
-                return False, f"Database may be corrupted (only {table_count} tables)"
+def _print_report(report: List[Tuple[bool, str]]):
+    """Write a validation report with one print call."""
 
-        except sqlite3.Error as e:
-            return False, f"Corruption check failed: {e}"
+    lines = [line for passed, line in report if not (QUIET and passed)]
+    if lines:
+        print("\n".join(lines))
 
 
 # CLI test
@@ -6,15 +6,35 @@ Checks system readiness before production execution.
 
 import os
 import sqlite3
+import sys
 import shutil
+import time
+from collections import namedtuple
 from pathlib import Path
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "common"))
+
+from db import open_db, VAULT_DB_OPTIONS
 
 
 # Paths
 WORKSPACE_ROOT = Path(os.environ.get("CW_ROOT", str(Path.home() / "Library" / "CloudStorage" / "OneDrive-SAPASPA" / "OD PARA Sales Strategy" / "Claude Workspace")))
 LOCAL_VAULT_DB = WORKSPACE_ROOT / "local_vault.db"
 
+# Directories that never hold synced workspace content
+SYNC_SCAN_SKIP_DIRS = {".git", ".tmp", "node_modules", "__pycache__"}
+SYNC_CHECK_TTL_SECONDS = 60
+
+# Last .cloud scan: (workspace mtime_ns, checked at, first stub or None)
+_sync_scan_cache = None
+
+# AUTONOMOUS_QUIET=1 drops passing pre-flight lines; failures are always shown
+QUIET = os.environ.get("AUTONOMOUS_QUIET") == "1"
+
+# One probe of the vault per validate(); the database checks read from it
+VaultProbe = namedtuple("VaultProbe", ["table_count", "count_error", "locked", "lock_error"])
+
 
 class PreFlightValidator:
     """Validates system state before production execution."""
@@ -27,6 +47,29 @@ class PreFlightValidator:
             self._check_onedrive_sync_healthy,
             self._check_disk_space,
         ]
+        # local_vault.db connection shared by the database checks, opened on first use
+        self._conn = None
+        self._probe = None
+
+    def _vault_conn(self) -> sqlite3.Connection:
+        """Return the persistent vault connection."""
+
+        if self._conn is None:
+            self._conn = open_db(
+                LOCAL_VAULT_DB,
+                timeout=1.0,
+                check_same_thread=False,
+                **VAULT_DB_OPTIONS
+            )
+
+        return self._conn
+
+    def close(self):
+        """Close the vault connection (reopened on next use)."""
+
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
     def validate(self, task: Dict[str, Any]) -> Tuple[bool, List[str]]:
         """
@@ -39,29 +82,32 @@ class PreFlightValidator:
             Tuple of (all_passed, issues)
         """
 
-        print("[Pre-flight] Running validation checks...")
+        # (passed, line) pairs, written in one go when validation finishes
+        report = [(True, "[Pre-flight] Running validation checks...")]
         issues = []
+        self._probe = None
 
         for check in self.checks:
             try:
                 passed, message = check(task)
                 if passed:
-                    print(f"[Pre-flight]   ✓ {message}")
+                    report.append((True, f"[Pre-flight]   ✓ {message}"))
                 else:
-                    print(f"[Pre-flight]   ✗ {message}")
+                    report.append((False, f"[Pre-flight]   ✗ {message}"))
                     issues.append(message)
             except Exception as e:
                 error_msg = f"{check.__name__}: {e}"
-                print(f"[Pre-flight]   ✗ {error_msg}")
+                report.append((False, f"[Pre-flight]   ✗ {error_msg}"))
                 issues.append(error_msg)
 
         all_passed = len(issues) == 0
 
         if all_passed:
-            print("[Pre-flight] ✓ All checks passed")
+            report.append((True, "[Pre-flight] ✓ All checks passed"))
         else:
-            print(f"[Pre-flight] ✗ {len(issues)} check(s) failed")
+            report.append((False, f"[Pre-flight] ✗ {len(issues)} check(s) failed"))
 
+        _print_report(report)
         return all_passed, issues
 
     def _check_workspace_accessible(self, task: Dict[str, Any]) -> Tuple[bool, str]:
@@ -72,53 +118,92 @@ class PreFlightValidator:
         else:
             return False, f"Workspace not accessible: {WORKSPACE_ROOT}"
 
-    def _check_database_accessible(self, task: Dict[str, Any]) -> Tuple[bool, str]:
-        """Check if database is accessible."""
+    def _run_db_probe(self) -> VaultProbe:
+        """
+        Probe the vault once: write lock and table count in one round-trip.
 
-        if LOCAL_VAULT_DB.exists():
-            try:
-                conn = sqlite3.connect(str(LOCAL_VAULT_DB))
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table'")
-                count = cursor.fetchone()[0]
-                conn.close()
-
-                if count > 0:
-                    return True, f"Database accessible ({count} tables)"
-                else:
-                    return False, "Database has no tables"
+        The count runs inside the IMMEDIATE transaction when the lock is
+        free, and as a plain read when another writer holds it.
+        """
 
-            except sqlite3.Error as e:
-                return False, f"Database error: {e}"
-        else:
-            return False, "Database file not found"
+        if self._probe is not None:
+            return self._probe
 
-    def _check_database_not_locked(self, task: Dict[str, Any]) -> Tuple[bool, str]:
-        """Check if database is locked."""
+        conn = self._vault_conn()
+        locked, lock_error = False, None
+        table_count, count_error = None, None
 
         try:
-            conn = sqlite3.connect(str(LOCAL_VAULT_DB), timeout=1.0)
-            cursor = conn.cursor()
-            cursor.execute("BEGIN IMMEDIATE")
-            conn.rollback()
-            conn.close()
-            return True, "Database not locked"
+            conn.execute("BEGIN IMMEDIATE")
         except sqlite3.OperationalError as e:
             if "locked" in str(e).lower():
-                return False, "Database is locked"
+                locked = True
             else:
-                return False, f"Database check failed: {e}"
+                lock_error = str(e)
+
+        try:
+            table_count = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type='table'"
+            ).fetchone()[0]
+        except sqlite3.Error as e:
+            count_error = str(e)
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+        self._probe = VaultProbe(table_count, count_error, locked, lock_error)
+        return self._probe
+
+    def _check_database_accessible(self, task: Dict[str, Any]) -> Tuple[bool, str]:
+        """Check if database is accessible."""
+
+        if not LOCAL_VAULT_DB.exists():
+            return False, "Database file not found"
+
+        probe = self._run_db_probe()
+        if probe.count_error:
+            return False, f"Database error: {probe.count_error}"
+        if probe.table_count > 0:
+            return True, f"Database accessible ({probe.table_count} tables)"
+        return False, "Database has no tables"
+
+    def _check_database_not_locked(self, task: Dict[str, Any]) -> Tuple[bool, str]:
+        """Check if database is locked."""
+
+        # Missing file is reported by _check_database_accessible; don't create it here
+        if not LOCAL_VAULT_DB.exists():
+            return True, "Database not locked (no database file)"
+
+        probe = self._run_db_probe()
+        if probe.locked:
+            return False, "Database is locked"
+        if probe.lock_error:
+            return False, f"Database check failed: {probe.lock_error}"
+        return True, "Database not locked"
 
     def _check_onedrive_sync_healthy(self, task: Dict[str, Any]) -> Tuple[bool, str]:
         """Check OneDrive sync status (basic check)."""
 
-        # Basic check: see if .cloud files exist (indicates sync issues)
-        cloud_files = list(WORKSPACE_ROOT.rglob("*.cloud"))
+        global _sync_scan_cache
+
+        # Basic check: see if .cloud files exist (indicates sync issues).
+        # Repeat pre-flights within the TTL reuse the last scan unless the
+        # workspace root itself changed.
+        mtime_ns = WORKSPACE_ROOT.stat().st_mtime_ns
+        now = time.monotonic()
+        if (_sync_scan_cache is not None
+                and _sync_scan_cache[0] == mtime_ns
+                and now - _sync_scan_cache[1] < SYNC_CHECK_TTL_SECONDS):
+            cloud_file = _sync_scan_cache[2]
+        else:
+            cloud_file = _find_cloud_file(str(WORKSPACE_ROOT))
+            _sync_scan_cache = (mtime_ns, now, cloud_file)
 
-        if len(cloud_files) == 0:
+        if cloud_file is None:
             return True, "OneDrive sync healthy (no .cloud files)"
         else:
-            return False, f"OneDrive sync issues detected ({len(cloud_files)} .cloud files)"
+            relative = os.path.relpath(cloud_file, WORKSPACE_ROOT)
+            return False, f"OneDrive sync issues detected (.cloud file: {relative})"
 
     def _check_disk_space(self, task: Dict[str, Any]) -> Tuple[bool, str]:
         """Check available disk space."""
@@ -133,6 +218,34 @@ class PreFlightValidator:
             return False, f"Low disk space ({free_gb:.1f} GB free)"
 
 
+def _find_cloud_file(root: str) -> Optional[str]:
+    """Return the first *.cloud stub under root, or None (stops at first hit)."""
+
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SYNC_SCAN_SKIP_DIRS:
+                            pending.append(entry.path)
+                    elif entry.name.endswith(".cloud"):
+                        return entry.path
+        except OSError:
+            # Vanished or unreadable directory: nothing to report from it
+            continue
+
+    return None
+
+
+def _print_report(report: List[Tuple[bool, str]]):
+    """Write a validation report with one print call."""
+
+    lines = [line for passed, line in report if not (QUIET and passed)]
+    if lines:
+        print("\n".join(lines))
+
+
 # CLI test
 if __name__ == "__main__":
     validator = PreFlightValidator()
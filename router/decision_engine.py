@@ -4,12 +4,23 @@ Autonomous System - Decision Router
 Routes tasks based on risk level and permission profile.
 """
 
+import functools
 import json
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Tuple
 from enum import Enum
 
-from risk_scorer import calculate_risk_score, RiskLevel
+try:
+    # Faster JSON decoding (pip install orjson)
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+from risk_scorer import (
+    calculate_risk_score_fast, financial_impact, score_action,
+    RiskLevel, CRITICAL_ACTIONS
+)
 
 
 class ActionType(Enum):
@@ -20,19 +31,70 @@ class ActionType(Enum):
     BLOCK = "block"
 
 
+# Plain dict lookup instead of ActionType(value), which goes through EnumMeta.__call__
+_ACTION_TYPE_BY_VALUE = {a.value: a for a in ActionType}
+
 PROFILES_DIR = Path(__file__).parent / "profiles"
 
+# Always blocked whatever the profile says; these score CRITICAL regardless
+HARD_BLOCK_ACTIONS = CRITICAL_ACTIONS
+
+_HARD_BLOCK_RULE = MappingProxyType({
+    "action": ActionType.BLOCK.value,
+    "notification": "immediate",
+    "description": "Blocked - action is on the hard-block list"
+})
+
+
+def load_profile(profile_name: str = "autonomous") -> Mapping[str, Any]:
+    """
+    Load permission profile configuration.
+
+    Parsed profiles are cached per (name, mtime), so edits to a profile
+    file are picked up on the next decision. The result is shared between
+    callers and therefore read-only.
+    """
+
+    return _load_profile_cached(*_profile_stamp(profile_name))
 
-def load_profile(profile_name: str = "autonomous") -> Dict[str, Any]:
-    """Load permission profile configuration."""
+
+def _profile_stamp(profile_name: str) -> Tuple[Path, int]:
+    """Profile file and its mtime, the cache key for anything derived from it."""
 
     profile_path = PROFILES_DIR / f"{profile_name}.json"
 
-    if not profile_path.exists():
+    try:
+        return profile_path, profile_path.stat().st_mtime_ns
+    except FileNotFoundError:
         raise FileNotFoundError(f"Profile not found: {profile_path}")
 
-    with open(profile_path, "r") as f:
-        return json.load(f)
+
+@functools.lru_cache(maxsize=32)
+def _load_profile_cached(profile_path: Path, mtime_ns: int) -> Mapping[str, Any]:
+    """Parse a profile file; mtime_ns is only part of the cache key."""
+
+    with open(profile_path, "rb") as f:
+        return _freeze(json_loads(f.read()))
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively wrap dicts in MappingProxyType and turn lists into tuples."""
+
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Inverse of _freeze: plain dicts and lists for callers (e.g. json.dumps)."""
+
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
 
 
 def make_decision(
@@ -52,11 +114,62 @@ def make_decision(
         Tuple of (action, decision_metadata)
     """
 
+    # Hard-blocked actions need neither the breakdown nor the profile rules
+    if task.get("action_type") in HARD_BLOCK_ACTIONS:
+        risk_score, risk_level = calculate_risk_score_fast(task)
+        return ActionType.BLOCK, {
+            "action": ActionType.BLOCK.value,
+            "risk_score": risk_score,
+            "risk_level": risk_level.value,
+            "reason": "hard_block_list",
+            "rule": dict(_HARD_BLOCK_RULE),
+            "requires_sandbox": False,
+            "notification_timing": _HARD_BLOCK_RULE["notification"]
+        }
+
+    # The decision depends on the task only through its action type and
+    # cost bucket, so same-shape tasks share one cached result
+    decision = _decide_cached(
+        task.get("action_type", "unknown"),
+        financial_impact(task.get("payload", {})),
+        *_profile_stamp(profile_name),
+        sandbox_score
+    )
+
+    # Copy the mutable parts so callers cannot corrupt the cache, and hand
+    # out the frozen profile rule as plain dicts/lists
+    decision = dict(decision)
+    decision["risk_breakdown"] = dict(decision["risk_breakdown"])
+    decision["rule"] = _thaw(decision["rule"])
+    if "conditions" in decision:
+        decision["conditions"] = _thaw(decision["conditions"])
+    if "conditions_met" in decision:
+        decision["conditions_met"] = list(decision["conditions_met"])
+
+    return _ACTION_TYPE_BY_VALUE[decision["action"]], decision
+
+
+@functools.lru_cache(maxsize=4096)
+def _decide_cached(
+    action_type: str,
+    financial_score: int,
+    profile_path: Path,
+    mtime_ns: int,
+    sandbox_score: int
+) -> Dict[str, Any]:
+    """
+    Decision metadata for one (action, cost bucket, profile, sandbox score).
+
+    Keyed on the profile mtime like _load_profile_cached, so edited
+    profiles take effect immediately. Only make_decision should call this;
+    the returned dict is shared.
+    """
+
     # Calculate risk
-    risk_score, risk_level, breakdown = calculate_risk_score(task)
+    risk_score, risk_level, breakdown = score_action(action_type, financial_score)
 
     # Load profile rules
-    profile = load_profile(profile_name)
+    profile = _load_profile_cached(profile_path, mtime_ns)
     rules = profile["rules"]
 
     # Get rule for risk level
@@ -109,13 +222,27 @@ def make_decision(
             decision["action"] = action.value
             decision["escalation_reason"] = f"Sandbox score {sandbox_score} below threshold {rule['sandbox_threshold']}"
 
-    return action, decision
+    return decision
 
 
-def explain_decision(task: Dict[str, Any], profile_name: str = "autonomous") -> str:
-    """Generate human-readable explanation of routing decision."""
+def explain_decision(
+    task: Dict[str, Any],
+    profile_name: str = "autonomous",
+    *,
+    decision: Dict[str, Any] = None,
+    action: ActionType = None
+) -> str:
+    """
+    Generate human-readable explanation of routing decision.
 
-    action, decision = make_decision(task, profile_name)
+    Pass decision (and optionally action) from an earlier make_decision
+    call to explain it without deciding again.
+    """
+
+    if decision is None:
+        action, decision = make_decision(task, profile_name)
+    elif action is None:
+        action = _ACTION_TYPE_BY_VALUE[decision["action"]]
 
     lines = [
         f"Task: {task.get('action_type', 'unknown')}",
@@ -171,6 +298,10 @@ def run_tests():
     print("Decision Router Test Suite")
     print("=" * 60)
 
+    # Start from the profile files on disk, not a previous run's cache
+    _load_profile_cached.cache_clear()
+    _decide_cached.cache_clear()
+
     passed = 0
     failed = 0
 
@@ -184,7 +315,7 @@ def run_tests():
             sandbox_score=sandbox_score
         )
 
-        print(explain_decision(test_case['task']))
+        print(explain_decision(test_case['task'], decision=decision, action=action))
 
         if sandbox_score:
             print(f"\nSandbox Score: {sandbox_score}/100")
@@ -217,8 +348,8 @@ if __name__ == "__main__":
         task_json = sys.argv[sys.argv.index("--decide") + 1] if len(sys.argv) > sys.argv.index("--decide") + 1 else None
 
         if task_json:
-            with open(task_json, "r") as f:
-                task = json.load(f)
+            with open(task_json, "rb") as f:
+                task = json_loads(f.read())
             print(explain_decision(task))
         else:
             print("Usage: decision_engine.py --decide <task.json>")
@@ -4,10 +4,19 @@ Autonomous System - Risk Scorer
 Calculates risk score (0-100) for task safety assessment.
 """
 
+import bisect
+import functools
 import json
-from typing import Dict, Any, Tuple
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple
 from enum import Enum
 
+try:
+    # Vectorized batch scoring (pip install numpy)
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class RiskLevel(Enum):
     """Risk level categories."""
@@ -17,13 +26,93 @@ class RiskLevel(Enum):
     CRITICAL = "CRITICAL" # 86-100: hard block
 
 
-# Configurable weights (sum to 100)
-RISK_WEIGHTS = {
+# Configurable weights (sum to 100). Read-only at runtime: they are baked
+# into the _W_* constants and into cached explanations and decisions
+RISK_WEIGHTS: Mapping[str, int] = MappingProxyType({
     "external_action": 40,      # Email, API calls, external services
     "data_modification": 30,    # DB writes, file deletes
     "irreversibility": 20,      # Can't undo (payments, deletions)
     "financial_impact": 10      # Cost > $0
-}
+})
+
+# Inclusive upper score of each level but the last, paired with _LEVELS
+_LEVEL_UPPER_BOUNDS = (30, 60, 85)
+_LEVELS = (RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL)
+
+# Weights as fractions, baked once for the scoring expression
+_W_EXTERNAL = RISK_WEIGHTS["external_action"] / 100
+_W_DATA_MODIFICATION = RISK_WEIGHTS["data_modification"] / 100
+_W_IRREVERSIBILITY = RISK_WEIGHTS["irreversibility"] / 100
+_W_FINANCIAL = RISK_WEIGHTS["financial_impact"] / 100
+
+# External action scoring: email, API calls, external services
+EXTERNAL_ACTIONS = frozenset({
+    "send_email", "api_call", "webhook", "slack_message",
+    "http_post", "http_put", "http_delete", "external_service"
+})
+
+# Data modification scoring, first matching bucket wins
+DATA_MODIFICATION_BUCKETS = (
+    (frozenset({"write_db", "update_db", "delete_db"}), 100),
+    (frozenset({"write_file", "delete_file"}), 70),
+    # System-level operations that modify many files
+    (frozenset({"system_optimization", "file_migration", "bulk_operation"}), 85),
+    # Scripts can do anything - assume high risk
+    (frozenset({"execute_script", "run_command"}), 80),
+    (frozenset({"query_db", "read_file"}), 0),  # Read-only
+)
+
+# Irreversibility scoring, first matching bucket wins
+IRREVERSIBILITY_BUCKETS = (
+    (frozenset({
+        "delete_db", "delete_file", "send_email", "payment",
+        "close_pr", "merge_pr", "deploy"
+    }), 100),
+    # Bulk operations are hard to fully reverse
+    (frozenset({"system_optimization", "file_migration", "bulk_operation"}), 70),
+    # Scripts may be irreversible
+    (frozenset({"execute_script", "run_command"}), 60),
+    # Partial irreversibility (can rollback but not perfectly)
+    (frozenset({"update_db", "write_file"}), 40),
+)
+
+# Always scored at least CRITICAL
+CRITICAL_ACTIONS = frozenset({"send_email", "payment", "delete_db", "deploy", "merge_pr"})
+
+
+def _build_action_scores() -> Dict[str, Tuple[int, int, int]]:
+    """Flatten the buckets into action_type -> (data_mod, irreversibility, external)."""
+
+    def first_match(buckets, action_type):
+        return next((score for actions, score in buckets if action_type in actions), 0)
+
+    known = EXTERNAL_ACTIONS.union(
+        *(actions for actions, _ in DATA_MODIFICATION_BUCKETS + IRREVERSIBILITY_BUCKETS)
+    )
+
+    return {
+        action_type: (
+            first_match(DATA_MODIFICATION_BUCKETS, action_type),
+            first_match(IRREVERSIBILITY_BUCKETS, action_type),
+            100 if action_type in EXTERNAL_ACTIONS else 0
+        )
+        for action_type in known
+    }
+
+
+ACTION_SCORES = _build_action_scores()
+_DEFAULT_ACTION_SCORES = (0, 0, 0)
+
+if np is not None:
+    # Column arrays over ACTION_SCORES for calculate_risk_scores; row 0 is
+    # the unknown-action default
+    ACTION_TO_IDX = {action_type: i for i, action_type in enumerate(sorted(ACTION_SCORES), 1)}
+    _rows = [_DEFAULT_ACTION_SCORES] + [ACTION_SCORES[a] for a in sorted(ACTION_SCORES)]
+    DM_SCORES, IRR_SCORES, EXT_SCORES = (np.array(col, dtype=np.float64) for col in zip(*_rows))
+    CRITICAL_MASK = np.array(
+        [False] + [a in CRITICAL_ACTIONS for a in sorted(ACTION_SCORES)], dtype=bool
+    )
+    del _rows
 
 
 def calculate_risk_score(task: Dict[str, Any]) -> Tuple[int, RiskLevel, Dict[str, Any]]:
@@ -37,87 +126,145 @@ def calculate_risk_score(task: Dict[str, Any]) -> Tuple[int, RiskLevel, Dict[str
         Tuple of (score, risk_level, breakdown)
     """
 
-    action_type = task.get("action_type", "unknown")
-    payload = task.get("payload", {})
+    return score_action(
+        task.get("action_type", "unknown"),
+        financial_impact(task.get("payload", {}))
+    )
+
+
+def score_action(action_type: str, financial_score: int) -> Tuple[int, RiskLevel, Dict[str, Any]]:
+    """
+    Calculate risk score from the two inputs it depends on.
+
+    Args:
+        action_type: Task action type
+        financial_score: financial_impact() of the task payload
+
+    Returns:
+        Tuple of (score, risk_level, breakdown)
+    """
+
+    data_modification, irreversibility, external_action = ACTION_SCORES.get(
+        action_type, _DEFAULT_ACTION_SCORES
+    )
 
     breakdown = {
-        "external_action": 0,
-        "data_modification": 0,
-        "irreversibility": 0,
-        "financial_impact": 0
+        "external_action": external_action,
+        "data_modification": data_modification,
+        "irreversibility": irreversibility,
+        "financial_impact": financial_score
     }
 
-    # External action scoring
-    external_actions = [
-        "send_email", "api_call", "webhook", "slack_message",
-        "http_post", "http_put", "http_delete", "external_service"
-    ]
-    if action_type in external_actions:
-        breakdown["external_action"] = 100
-
-    # Data modification scoring
-    if action_type in ["write_db", "update_db", "delete_db"]:
-        breakdown["data_modification"] = 100
-    elif action_type in ["write_file", "delete_file"]:
-        breakdown["data_modification"] = 70
-    elif action_type in ["system_optimization", "file_migration", "bulk_operation"]:
-        # System-level operations that modify many files
-        breakdown["data_modification"] = 85
-    elif action_type in ["execute_script", "run_command"]:
-        # Scripts can do anything - assume high risk
-        breakdown["data_modification"] = 80
-    elif action_type in ["query_db", "read_file"]:
-        breakdown["data_modification"] = 0  # Read-only
-
-    # Irreversibility scoring
-    irreversible_actions = [
-        "delete_db", "delete_file", "send_email", "payment",
-        "close_pr", "merge_pr", "deploy"
-    ]
-    if action_type in irreversible_actions:
-        breakdown["irreversibility"] = 100
-    elif action_type in ["system_optimization", "file_migration", "bulk_operation"]:
-        # Bulk operations are hard to fully reverse
-        breakdown["irreversibility"] = 70
-    elif action_type in ["execute_script", "run_command"]:
-        # Scripts may be irreversible
-        breakdown["irreversibility"] = 60
-    elif action_type in ["update_db", "write_file"]:
-        # Partial irreversibility (can rollback but not perfectly)
-        breakdown["irreversibility"] = 40
-
-    # Financial impact scoring
-    cost = payload.get("cost", 0)
-    if cost > 0:
-        if cost > 100:
-            breakdown["financial_impact"] = 100
-        elif cost > 10:
-            breakdown["financial_impact"] = 70
-        else:
-            breakdown["financial_impact"] = 30
+    score, risk_level = _score_and_level(
+        action_type, data_modification, irreversibility, external_action, financial_score
+    )
+
+    return score, risk_level, breakdown
 
-    # Calculate weighted score
-    total_score = sum(
-        breakdown[component] * RISK_WEIGHTS[component] / 100
-        for component in breakdown
+
+def calculate_risk_score_fast(task: Dict[str, Any]) -> Tuple[int, RiskLevel]:
+    """
+    Same score and level as calculate_risk_score, without the breakdown.
+
+    Args:
+        task: Task payload with action_type and details
+
+    Returns:
+        Tuple of (score, risk_level)
+    """
+
+    action_type = task.get("action_type", "unknown")
+
+    data_modification, irreversibility, external_action = ACTION_SCORES.get(
+        action_type, _DEFAULT_ACTION_SCORES
+    )
+
+    return _score_and_level(
+        action_type, data_modification, irreversibility, external_action,
+        financial_impact(task.get("payload", {}))
+    )
+
+
+def calculate_risk_scores(tasks: List[Dict[str, Any]]) -> List[int]:
+    """
+    Score many tasks at once; same results as calculate_risk_score.
+
+    With numpy installed the weighting runs as array operations over the
+    whole batch; otherwise tasks are scored one by one.
+
+    Args:
+        tasks: Task payloads with action_type and details
+
+    Returns:
+        List of scores, in task order
+    """
+
+    if np is None:
+        return [calculate_risk_score_fast(task)[0] for task in tasks]
+
+    count = len(tasks)
+    idxs = np.fromiter(
+        (ACTION_TO_IDX.get(task.get("action_type", "unknown"), 0) for task in tasks),
+        dtype=np.intp,
+        count=count
+    )
+    costs = np.fromiter(
+        (task.get("payload", {}).get("cost", 0) for task in tasks),
+        dtype=np.float64,
+        count=count
+    )
+    financial = np.select([costs > 100, costs > 10, costs > 0], [100.0, 70.0, 30.0], 0.0)
+
+    total = (
+        EXT_SCORES[idxs] * _W_EXTERNAL
+        + DM_SCORES[idxs] * _W_DATA_MODIFICATION
+        + IRR_SCORES[idxs] * _W_IRREVERSIBILITY
+        + financial * _W_FINANCIAL
+    )
+
+    # Critical action boost, as in _score_and_level
+    total = np.where(CRITICAL_MASK[idxs], np.maximum(total, 86), total)
+
+    return total.astype(np.int64).tolist()
+
+
+def financial_impact(payload: Dict[str, Any]) -> int:
+    """Financial impact scoring from payload cost (0, 30, 70 or 100)."""
+
+    cost = payload.get("cost", 0)
+    if cost > 100:
+        return 100
+    elif cost > 10:
+        return 70
+    elif cost > 0:
+        return 30
+    return 0
+
+
+def _score_and_level(
+    action_type: str,
+    data_modification: int,
+    irreversibility: int,
+    external_action: int,
+    financial_impact: int
+) -> Tuple[int, RiskLevel]:
+    """Weighted score and its risk level."""
+
+    total_score = (
+        external_action * _W_EXTERNAL
+        + data_modification * _W_DATA_MODIFICATION
+        + irreversibility * _W_IRREVERSIBILITY
+        + financial_impact * _W_FINANCIAL
     )
 
     # Critical action boost (override to CRITICAL level)
-    critical_actions = ["send_email", "payment", "delete_db", "deploy", "merge_pr"]
-    if action_type in critical_actions:
+    if action_type in CRITICAL_ACTIONS:
         total_score = max(total_score, 86)  # Force CRITICAL threshold
 
-    # Determine risk level
-    if total_score <= 30:
-        risk_level = RiskLevel.LOW
-    elif total_score <= 60:
-        risk_level = RiskLevel.MEDIUM
-    elif total_score <= 85:
-        risk_level = RiskLevel.HIGH
-    else:
-        risk_level = RiskLevel.CRITICAL
+    # Determine risk level (bisect_left keeps each upper bound inclusive)
+    risk_level = _LEVELS[bisect.bisect_left(_LEVEL_UPPER_BOUNDS, total_score)]
 
-    return int(total_score), risk_level, breakdown
+    return int(total_score), risk_level
 
 
 def explain_risk_score(task: Dict[str, Any]) -> str:
@@ -131,7 +278,17 @@ def explain_risk_score(task: Dict[str, Any]) -> str:
         Formatted explanation string
     """
 
-    score, level, breakdown = calculate_risk_score(task)
+    return _format_explanation(
+        task.get("action_type", "unknown"),
+        financial_impact(task.get("payload", {}))
+    )
+
+
+@functools.lru_cache(maxsize=512)
+def _format_explanation(action_type: str, financial_score: int) -> str:
+    """Explanation text for one (action type, cost bucket) shape."""
+
+    score, level, breakdown = score_action(action_type, financial_score)
 
     lines = [
         f"Risk Score: {score}/100 ({level.value})",
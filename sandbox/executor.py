@@ -4,49 +4,176 @@ Autonomous System - Sandbox Executor
 Isolated environment for safe task execution with automatic fix iterations.
 """
 
-import json
+import atexit
 import os
-import shutil
+import queue
 import sqlite3
-import uuid
+import stat
+import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Tuple, Optional
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
+
+from db import open_db, build_update_sql, load_schema, check_identifiers
+
+try:
+    # Faster JSON encoding (pip install orjson), emits bytes directly
+    import orjson
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
+
 
 # Paths
-SANDBOX_ROOT = Path.home() / ".claude" / "autonomous" / "sandbox" / "environments"
+def _sandbox_root() -> Path:
+    """
+    Where sandbox environments live.
+
+    SANDBOX_TMPDIR overrides; otherwise /dev/shm (Linux tmpfs) when
+    writable, so throwaway vault copies never hit the disk, with a per-user
+    directory since /dev/shm is shared. Elsewhere (macOS) ~/.claude.
+    """
+
+    override = os.environ.get("SANDBOX_TMPDIR")
+    if override:
+        return Path(override)
+
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        shm_root = Path("/dev/shm") / f"claude-sandbox-{os.getuid()}"
+        if _is_private_dir(shm_root):
+            return shm_root
+
+    return Path.home() / ".claude" / "autonomous" / "sandbox" / "environments"
+
+
+def _is_private_dir(path: Path) -> bool:
+    """
+    Create path as a 0o700 directory if missing, then check it is really ours.
+
+    The /dev/shm name is predictable and /dev/shm is world-writable, so
+    another user could have created it (or a symlink) first. Only a real
+    directory owned by us with no group/other access is accepted; the
+    sticky bit on /dev/shm keeps others from swapping it out afterwards.
+    """
+
+    try:
+        path.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and not st.st_mode & 0o077
+    )
+
+
+SANDBOX_ROOT = _sandbox_root()
 WORKSPACE_ROOT = Path(os.environ.get("CW_ROOT", str(Path.home() / "Library" / "CloudStorage" / "OneDrive-SAPASPA" / "OD PARA Sales Strategy" / "Claude Workspace")))
 LOCAL_VAULT_DB = WORKSPACE_ROOT / "local_vault.db"
 
+# Actions that never write to the sandbox vault (query_db only for SELECT)
+READ_ONLY_ACTIONS = {"query_db", "read_file"}
+
+# Warm sandbox directories kept for reuse within one process
+POOL_SIZE = 4
+
+# Sandbox copies are throwaway, so they can use WAL and a larger cache;
+# a hard-linked vault is opened read-only and keeps its own journal mode
+SANDBOX_DB_OPTIONS = {
+    "cache_size": -64000,
+    "mmap_size": 268435456,
+}
+
+# Deletes discarded sandbox trees off the task's critical path; created on
+# first use, like the shutil import, since many runs never discard a tree
+_cleanup_executor = None
+_cleanup_executor_lock = threading.Lock()
+
+
+def _short_id() -> str:
+    """8 random hex characters, the same shape as str(uuid.uuid4())[:8]."""
+
+    return os.urandom(4).hex()
+
+
+def _submit_cleanup(fn, *args, **kwargs):
+    """Run fn on the background cleanup executor."""
+
+    global _cleanup_executor
+
+    with _cleanup_executor_lock:
+        if _cleanup_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sandbox-cleanup")
+
+    _cleanup_executor.submit(fn, *args, **kwargs)
+
+
+def _discard_tree(path: Path):
+    """
+    Delete a directory tree in the background.
+
+    The tree is first renamed to a .trash sibling under SANDBOX_ROOT (one
+    metadata operation), so its old path is free again immediately.
+    """
+
+    import shutil
+
+    trash = SANDBOX_ROOT / f".{_short_id()}.trash"
+    try:
+        os.rename(path, trash)
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+        return
+
+    _submit_cleanup(shutil.rmtree, trash, ignore_errors=True)
+
 
 class SandboxExecutor:
     """Executes tasks in isolated sandbox environment."""
 
+    # Released sandbox directories, reset and ready for the next task
+    _POOL: "queue.Queue[Path]" = queue.Queue(maxsize=POOL_SIZE)
+
     def __init__(self, task: Dict[str, Any], max_iterations: int = 5):
         self.task = task
         self.task_id = task.get("task_id", "unknown")
         self.max_iterations = max_iterations
-        self.cycle_id = str(uuid.uuid4())[:8]
+        self.cycle_id = _short_id()
         self.sandbox_path = SANDBOX_ROOT / self.cycle_id
         self.iteration_results = []
+        # "hardlink", "vault" (read-only on the vault itself) or "backup"
+        self.db_mode = None
+        self.db_path = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._schema = None
 
     def create_environment(self) -> bool:
         """Create isolated sandbox environment."""
 
         try:
-            # Create sandbox directory structure
-            self.sandbox_path.mkdir(parents=True, exist_ok=True)
-
-            workspace_copy = self.sandbox_path / "workspace"
-            workspace_copy.mkdir(exist_ok=True)
+            # Warm directory from the pool, or a fresh workspace/workdir tree
+            self.sandbox_path = self.acquire()
 
             # Copy essential files only (not entire workspace)
-            db_copy = workspace_copy / "local_vault.db"
-            shutil.copy2(LOCAL_VAULT_DB, db_copy)
-
-            # Create workdir for outputs
-            (workspace_copy / "workdir").mkdir(exist_ok=True)
+            db_copy = self.sandbox_path / "workspace" / "local_vault.db"
+            self._prepare_db(db_copy)
 
             # Create manifest
             manifest = {
@@ -54,11 +181,12 @@ class SandboxExecutor:
                 "task_id": self.task_id,
                 "created_at": datetime.now().isoformat(),
                 "task_type": self.task.get("action_type"),
-                "max_iterations": self.max_iterations
+                "max_iterations": self.max_iterations,
+                "db_mode": self.db_mode
             }
 
-            with open(self.sandbox_path / "manifest.json", "w") as f:
-                json.dump(manifest, f, indent=2)
+            with open(self.sandbox_path / "manifest.json", "wb") as f:
+                f.write(json_dumps(manifest))
 
             return True
 
@@ -66,6 +194,215 @@ class SandboxExecutor:
             print(f"[Sandbox] Error creating environment: {e}")
             return False
 
+    def reset_task(self, task: Dict[str, Any]) -> bool:
+        """
+        Point a live sandbox at a new version of its task (a fix iteration).
+
+        The directory, database and open connection are kept when the last
+        iteration left them as create_environment made them: read-only
+        access stays valid for a read-only task, and a copy this connection
+        never changed (failed statements are rolled back) is still the same
+        as a fresh backup. Otherwise the database is prepared again.
+
+        Returns:
+            False if the environment could not be reset
+        """
+
+        was_read_only = self.db_mode != "backup"
+        self.task = task
+        self.task_id = task.get("task_id", "unknown")
+
+        try:
+            self._reset_workdir(self.sandbox_path)
+
+            changed = self._conn is not None and self._conn.total_changes > 0
+            if changed or was_read_only != self._is_read_only():
+                self._close_conn()
+                self._schema = None
+                self._prepare_db(self.sandbox_path / "workspace" / "local_vault.db")
+
+            return True
+
+        except Exception as e:
+            print(f"[Sandbox] Error resetting environment: {e}")
+            return False
+
+    @classmethod
+    def acquire(cls) -> Path:
+        """Pop a warm sandbox directory, or create one if the pool is empty."""
+
+        try:
+            return cls._POOL.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Private root for the fallback location; a /dev/shm root was already
+        # created and ownership-checked by _sandbox_root
+        SANDBOX_ROOT.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+        sandbox_path = SANDBOX_ROOT / _short_id()
+        (sandbox_path / "workspace" / "workdir").mkdir(parents=True, exist_ok=True)
+        return sandbox_path
+
+    @classmethod
+    def release(cls, sandbox_path: Path):
+        """
+        Reset a sandbox directory and return it to the pool.
+
+        Only task outputs are cleared; local_vault.db stays in place and
+        _prepare_db decides whether the next task can reuse it. Directories
+        that do not fit in the pool are deleted.
+        """
+
+        try:
+            cls._reset_workdir(sandbox_path)
+
+            for name in ("manifest.json", "results.json"):
+                (sandbox_path / name).unlink(missing_ok=True)
+
+            cls._POOL.put_nowait(sandbox_path)
+        except (OSError, queue.Full):
+            _discard_tree(sandbox_path)
+
+    @staticmethod
+    def _reset_workdir(sandbox_path: Path):
+        """Swap in an empty workdir and delete the old one in the background."""
+
+        workdir = sandbox_path / "workspace" / "workdir"
+        with os.scandir(workdir) as entries:
+            dirty = next(entries, None) is not None
+
+        if dirty:
+            _discard_tree(workdir)
+            workdir.mkdir()
+
+    @classmethod
+    def drain_pool(cls):
+        """
+        Delete all pooled sandbox directories and leftover .trash trees.
+
+        Runs at exit, after the cleanup threads have been joined, so the
+        deletion here is synchronous.
+        """
+
+        import shutil
+
+        while True:
+            try:
+                sandbox_path = cls._POOL.get_nowait()
+            except queue.Empty:
+                break
+            shutil.rmtree(sandbox_path, ignore_errors=True)
+
+        # Trees whose background deletion was cut short by a crash
+        for trash in SANDBOX_ROOT.glob(".*.trash"):
+            shutil.rmtree(trash, ignore_errors=True)
+
+    def _is_read_only(self) -> bool:
+        """Whether the task can run against a read-only vault."""
+
+        action_type = self.task.get("action_type")
+        if action_type not in READ_ONLY_ACTIONS:
+            return False
+
+        if action_type == "query_db":
+            # Decided before the query runs, so only a SELECT prefix counts;
+            # upper-case just the keyword, not the whole query text
+            query = self.task.get("payload", {}).get("query") or ""
+            return query.lstrip()[:6].upper() == "SELECT"
+
+        return True
+
+    def _prepare_db(self, db_copy: Path):
+        """
+        Give the sandbox its local_vault.db.
+
+        Read-only tasks get a hard link to the vault (no data copied) and
+        connect with mode=ro, so they cannot write through the link; SQLite
+        locks are per inode, so the link still respects vault writers.
+        When the link is cross-device (a tmpfs or non-OneDrive sandbox
+        root), they open the vault itself with mode=ro instead, which is
+        the same file under another name.
+
+        Everything else gets a consistent copy via the online backup API;
+        on a tmpfs root that copy never touches the disk.
+
+        In a pooled directory, a link that still points at the current
+        vault inode is reused as is. A previous writer's copy is never
+        reused, and is removed first so the backup cannot write through an
+        old link into the real vault.
+        """
+
+        # sqlite3.connect would silently create an empty vault
+        if not LOCAL_VAULT_DB.exists():
+            raise FileNotFoundError(f"Database not found: {LOCAL_VAULT_DB}")
+
+        read_only = self._is_read_only()
+        self.db_path = db_copy
+
+        if read_only and db_copy.exists() and os.path.samefile(db_copy, LOCAL_VAULT_DB):
+            self.db_mode = "hardlink"
+            return
+
+        # WAL/journal files left next to an old copy would be replayed into the new one
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            Path(f"{db_copy}{suffix}").unlink(missing_ok=True)
+
+        if read_only:
+            try:
+                os.link(LOCAL_VAULT_DB, db_copy)
+                self.db_mode = "hardlink"
+            except OSError:
+                self.db_mode = "vault"
+                self.db_path = LOCAL_VAULT_DB
+            return
+
+        self._check_free_space(db_copy.parent)
+
+        src = sqlite3.connect(str(LOCAL_VAULT_DB))
+        try:
+            dst = sqlite3.connect(str(db_copy))
+            try:
+                src.backup(dst, pages=1024)
+            finally:
+                dst.close()
+        finally:
+            src.close()
+
+        self.db_mode = "backup"
+
+    def _check_free_space(self, directory: Path):
+        """Warn when the sandbox root (e.g. a small tmpfs) cannot hold a vault copy."""
+
+        import shutil
+
+        needed = LOCAL_VAULT_DB.stat().st_size
+        free = shutil.disk_usage(directory).free
+        if free < needed:
+            print(f"[Sandbox] Warning: {free} bytes free in {SANDBOX_ROOT}, "
+                  f"vault copy needs {needed} (set SANDBOX_TMPDIR to move it)")
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Sandbox database connection, opened on first use and kept until cleanup."""
+
+        if self._conn is None:
+            if self.db_mode != "backup":
+                # The real vault (or a link to it): never open it writable
+                self._conn = open_db(self.db_path, wal=False, readonly=True, **SANDBOX_DB_OPTIONS)
+            else:
+                self._conn = open_db(self.db_path, **SANDBOX_DB_OPTIONS)
+
+        return self._conn
+
+    def _close_conn(self):
+        """Close the sandbox database connection, if open."""
+
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
+
     def execute_task(self, iteration: int = 1) -> Tuple[bool, Any, str]:
         """
         Execute task in sandbox.
@@ -79,20 +416,12 @@ class SandboxExecutor:
 
         try:
             # Route to appropriate executor based on action type
-            if action_type == "query_db":
-                return self._execute_query_db(payload)
-            elif action_type == "update_db":
-                return self._execute_update_db(payload)
-            elif action_type == "write_file":
-                return self._execute_write_file(payload)
-            elif action_type == "read_file":
-                return self._execute_read_file(payload)
-            elif action_type in ["execute_script", "system_optimization"]:
-                # Scripts run in dry-run mode in sandbox
-                return self._execute_script_dryrun(payload)
-            else:
+            handler = self._DISPATCH.get(action_type)
+            if handler is None:
                 return False, None, f"Unsupported action type: {action_type}"
 
+            return handler(self, payload)
+
         except Exception as e:
             return False, None, str(e)
 
@@ -103,26 +432,26 @@ class SandboxExecutor:
         if not query:
             return False, None, "Missing query in payload"
 
-        db_path = self.sandbox_path / "workspace" / "local_vault.db"
-
         try:
-            conn = sqlite3.connect(str(db_path))
+            conn = self._get_conn()
             cursor = conn.cursor()
             cursor.execute(query)
 
-            # Fetch results
-            if query.strip().upper().startswith("SELECT"):
+            # Row-returning statements (SELECT, WITH, PRAGMA, ... RETURNING) set a description
+            if cursor.description is not None:
                 results = cursor.fetchall()
-                conn.close()
+                # Only DML opens a transaction, e.g. UPDATE ... RETURNING
+                if conn.in_transaction:
+                    conn.commit()
                 return True, results, ""
             else:
                 # Non-SELECT queries
                 conn.commit()
                 affected = cursor.rowcount
-                conn.close()
                 return True, {"affected_rows": affected}, ""
 
         except sqlite3.Error as e:
+            self._rollback()
             return False, None, f"Database error: {e}"
 
     def _execute_update_db(self, payload: Dict[str, Any]) -> Tuple[bool, Any, str]:
@@ -135,28 +464,37 @@ class SandboxExecutor:
         if not table or not updates:
             return False, None, "Missing table or updates in payload"
 
-        # Build UPDATE query
-        set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
-        where_clause = " AND ".join([f"{k} = ?" for k in conditions.keys()]) if conditions else "1=1"
+        try:
+            conn = self._get_conn()
 
-        query = f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
-        values = list(updates.values()) + list(conditions.values())
+            # Table and column names are interpolated, so they must exist in the vault
+            if self._schema is None:
+                self._schema = load_schema(conn)
+            error = check_identifiers(self._schema, table, [*updates, *conditions])
+            if error:
+                return False, None, f"Database error: {error}"
 
-        db_path = self.sandbox_path / "workspace" / "local_vault.db"
+            # Build UPDATE query (cached per table and column shape)
+            query = build_update_sql(table, tuple(updates), tuple(conditions))
+            values = list(updates.values()) + list(conditions.values())
 
-        try:
-            conn = sqlite3.connect(str(db_path))
             cursor = conn.cursor()
             cursor.execute(query, values)
             conn.commit()
             affected = cursor.rowcount
-            conn.close()
 
             return True, {"affected_rows": affected}, ""
 
         except sqlite3.Error as e:
+            self._rollback()
             return False, None, f"Database error: {e}"
 
+    def _rollback(self):
+        """Discard a failed statement's open transaction on the kept connection."""
+
+        if self._conn is not None and self._conn.in_transaction:
+            self._conn.rollback()
+
     def _execute_write_file(self, payload: Dict[str, Any]) -> Tuple[bool, Any, str]:
         """Write file in sandbox."""
 
@@ -171,8 +509,17 @@ class SandboxExecutor:
         full_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            with open(full_path, "w") as f:
-                f.write(content)
+            data = memoryview(content.encode("utf-8") if isinstance(content, str) else content)
+
+            # Unbuffered write of the encoded payload into a preallocated file
+            fd = os.open(full_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                if data.nbytes and hasattr(os, "posix_fallocate"):
+                    os.posix_fallocate(fd, 0, data.nbytes)
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
 
             return True, {"bytes_written": len(content), "path": str(full_path)}, ""
 
@@ -217,22 +564,39 @@ class SandboxExecutor:
 
         return True, results, ""
 
+    # action_type -> handler; scripts run in dry-run mode in sandbox
+    _DISPATCH = {
+        "query_db": _execute_query_db,
+        "update_db": _execute_update_db,
+        "write_file": _execute_write_file,
+        "read_file": _execute_read_file,
+        "execute_script": _execute_script_dryrun,
+        "system_optimization": _execute_script_dryrun,
+    }
+
     def cleanup(self, keep_on_failure: bool = True):
-        """Clean up sandbox environment."""
+        """Clean up sandbox environment (returning it to the pool)."""
+
+        # Close first: the last close checkpoints WAL and removes -wal/-shm
+        self._close_conn()
 
         if self.sandbox_path.exists():
-            # Save iteration results before cleanup
+            if not keep_on_failure or all(it["success"] for it in self.iteration_results):
+                self.release(self.sandbox_path)
+                return
+
+            # Keep sandbox on failure for debugging, with its iteration results
             results_file = self.sandbox_path / "results.json"
-            with open(results_file, "w") as f:
-                json.dump({
+            with open(results_file, "wb") as f:
+                f.write(json_dumps({
                     "cycle_id": self.cycle_id,
                     "task_id": self.task_id,
                     "iterations": self.iteration_results
-                }, f, indent=2)
+                }))
 
-            # Keep sandbox on failure for debugging
-            if not keep_on_failure or all(it["success"] for it in self.iteration_results):
-                shutil.rmtree(self.sandbox_path)
+
+# Pooled directories only live as long as the process that warmed them
+atexit.register(SandboxExecutor.drain_pool)
 
 
 # Simple test
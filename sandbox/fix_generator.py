@@ -4,8 +4,134 @@ Autonomous System - Fix Generator
 LLM-powered automatic fix generation for failed tasks.
 """
 
+import functools
 import json
-from typing import Dict, Any, List, Optional
+import string
+from typing import Dict, Any, FrozenSet, List, Optional
+
+try:
+    # Linear-time DFA matching (pip install google-re2)
+    import re2 as re
+except ImportError:
+    import re
+
+try:
+    # SIMD multi-pattern scanner for error triggers (pip install hyperscan)
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+# Phrases _analyze_error branches on, matched case-insensitively in one pass
+_ERROR_TRIGGERS = (
+    "no such table",
+    "no such column",
+    "syntax error",
+    "one statement at a time",
+    "select",
+    "no such file or directory",
+    "permission denied",
+    "missing",
+    "payload",
+)
+
+if hyperscan is not None:
+    # Reports every trigger once, overlapping or not
+    _TRIGGER_DB = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    _TRIGGER_DB.compile(
+        expressions=[t.encode("ascii") for t in _ERROR_TRIGGERS],
+        ids=list(range(len(_ERROR_TRIGGERS))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(_ERROR_TRIGGERS)
+    )
+    _TRIGGER_RE = None
+else:
+    _TRIGGER_DB = None
+    # No trigger's suffix starts another, so non-overlapping matches find them all
+    _TRIGGER_RE = re.compile("(?i)" + "|".join(re.escape(t) for t in _ERROR_TRIGGERS))
+
+# Stripped from the end of a query by fix_sql_syntax in a single rstrip
+_TRAILING_SQL_JUNK = ";" + string.whitespace
+
+
+def _error_triggers(error: str) -> FrozenSet[str]:
+    """Trigger phrases present in an error message."""
+
+    if _TRIGGER_DB is None:
+        return frozenset(m.group(0).lower() for m in _TRIGGER_RE.finditer(error))
+
+    hits = set()
+    _TRIGGER_DB.scan(
+        error.encode("utf-8", "replace"),
+        match_event_handler=lambda id, start, end, flags, context: hits.add(_ERROR_TRIGGERS[id])
+    )
+    return frozenset(hits)
+
+
+@functools.lru_cache(maxsize=2048)
+def _classify_error(error: str, query_context: bool) -> Optional[Dict[str, Any]]:
+    """
+    Fix descriptor for an error message, cached since orchestrator retries
+    and recurring task failures hit the same errors again.
+
+    Args:
+        error: Error message from failed execution
+        query_context: Task has a query payload or is a query_db
+
+    Returns:
+        Shared fix dict (callers copy it), or None if unknown
+    """
+
+    triggers = _error_triggers(error)
+
+    # Database errors
+    if "no such table" in triggers:
+        return {
+            "type": "missing_table",
+            "description": "Table does not exist in database",
+            "fix_strategy": "use_existing_table"
+        }
+
+    if "no such column" in triggers:
+        return {
+            "type": "missing_column",
+            "description": "Column does not exist in table",
+            "fix_strategy": "use_existing_column"
+        }
+
+    if "syntax error" in triggers or "one statement at a time" in triggers:
+        # SQL syntax error or multi-statement error
+        if "select" in triggers or query_context:
+            return {
+                "type": "sql_syntax",
+                "description": "SQL syntax error or multi-statement in query",
+                "fix_strategy": "fix_sql_syntax"
+            }
+
+    # File errors
+    if "no such file or directory" in triggers:
+        return {
+            "type": "missing_file",
+            "description": "File path does not exist",
+            "fix_strategy": "create_parent_directories"
+        }
+
+    if "permission denied" in triggers:
+        return {
+            "type": "permission_error",
+            "description": "Insufficient permissions",
+            "fix_strategy": "unfixable"  # Cannot fix permission issues
+        }
+
+    # Payload errors
+    if "missing" in triggers and "payload" in triggers:
+        return {
+            "type": "missing_payload",
+            "description": "Required field missing in payload",
+            "fix_strategy": "add_default_values"
+        }
+
+    # Unknown error
+    return None
 
 
 class FixGenerator:
@@ -61,62 +187,16 @@ class FixGenerator:
     def _analyze_error(self, error: str) -> Optional[Dict[str, Any]]:
         """Analyze error and determine fix strategy."""
 
-        error_lower = error.lower()
-
-        # Database errors
-        if "no such table" in error_lower:
-            return {
-                "type": "missing_table",
-                "description": "Table does not exist in database",
-                "fix_strategy": "use_existing_table"
-            }
-
-        if "no such column" in error_lower:
-            return {
-                "type": "missing_column",
-                "description": "Column does not exist in table",
-                "fix_strategy": "use_existing_column"
-            }
-
-        if "syntax error" in error_lower or "one statement at a time" in error_lower:
-            # SQL syntax error or multi-statement error
-            if "select" in error_lower or "query" in self.payload or self.action_type == "query_db":
-                return {
-                    "type": "sql_syntax",
-                    "description": "SQL syntax error or multi-statement in query",
-                    "fix_strategy": "fix_sql_syntax"
-                }
-
-        # File errors
-        if "no such file or directory" in error_lower:
-            return {
-                "type": "missing_file",
-                "description": "File path does not exist",
-                "fix_strategy": "create_parent_directories"
-            }
-
-        if "permission denied" in error_lower:
-            return {
-                "type": "permission_error",
-                "description": "Insufficient permissions",
-                "fix_strategy": "unfixable"  # Cannot fix permission issues
-            }
-
-        # Payload errors
-        if "missing" in error_lower and "payload" in error_lower:
-            return {
-                "type": "missing_payload",
-                "description": "Required field missing in payload",
-                "fix_strategy": "add_default_values"
-            }
-
-        # Unknown error
-        return None
+        # Only whether the task is a query matters beyond the error text
+        query_context = "query" in self.payload or self.action_type == "query_db"
+        fix = _classify_error(error, query_context)
+        return dict(fix) if fix else None
 
     def _apply_fix(self, fix: Dict[str, Any]) -> Dict[str, Any]:
         """Apply fix strategy to task."""
 
-        fixed_task = self.task.copy()
+        # New payload dict: fixes must not leak back into the caller's task
+        fixed_task = {**self.task, "payload": dict(self.payload)}
         strategy = fix["fix_strategy"]
 
         if strategy == "unfixable":
@@ -142,8 +222,9 @@ class FixGenerator:
             # Fix common SQL syntax errors
             if "query" in self.payload:
                 query = self.payload["query"]
-                # Remove trailing semicolons (SQLite doesn't need them in Python)
-                query = query.rstrip(";").strip()
+                # Remove trailing semicolons (SQLite doesn't need them in Python),
+                # including any whitespace between or after them
+                query = query.rstrip(_TRAILING_SQL_JUNK).lstrip()
                 fixed_task["payload"]["query"] = query
 
         elif strategy == "create_parent_directories":
@@ -4,11 +4,14 @@ Autonomous System - Sandbox Orchestrator
 Coordinates sandbox execution with automatic fix iterations.
 """
 
+import threading
 import time
-from typing import Dict, Any, Tuple
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
-from executor import SandboxExecutor
+from executor import SandboxExecutor, LOCAL_VAULT_DB
 from score_calculator import ScoreCalculator
 from fix_generator import FixGenerator
 
@@ -16,16 +19,121 @@ from fix_generator import FixGenerator
 class SandboxOrchestrator:
     """Orchestrates sandbox testing with automatic fix iterations."""
 
+    # (query, vault inode/size/mtime) -> (success, result, error, execution_time)
+    # for read-only queries, shared by all orchestrators (and run_many threads)
+    _RESULT_CACHE: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+    _RESULT_CACHE_MAX = 1024
+    _RESULT_CACHE_LOCK = threading.Lock()
+
     def __init__(
         self,
         task: Dict[str, Any],
         max_iterations: int = 5,
-        target_score: int = 95
+        target_score: int = 95,
+        verbose: bool = True,
+        use_cache: bool = True
     ):
         self.task = task
         self.max_iterations = max_iterations
         self.target_score = target_score
-        self.iteration_history = []
+        # Per-iteration trace; callers with their own logging turn it off
+        self.verbose = verbose
+        # Reuse earlier sandbox results for identical read-only queries
+        self.use_cache = use_cache
+        # One record per iteration of the latest run(); records hold the
+        # executor result by reference, never a copy
+        self.iteration_history = deque(maxlen=max_iterations)
+        # Lines collected instead of printed (run_many prints them per task)
+        self._output = None
+
+    def _print(self, *args):
+        """Print, or buffer when running alongside other orchestrators."""
+
+        if not self.verbose:
+            return
+        if self._output is None:
+            print(*args)
+        else:
+            self._output.append(" ".join(str(a) for a in args))
+
+    @staticmethod
+    def _result_key(task: Dict[str, Any]) -> Optional[Tuple]:
+        """
+        Result cache key for a task, or None if its result must not be reused.
+
+        Only SELECT queries qualify (the sandbox runs them read-only against
+        the vault itself), and only their successful executions are stored. The key includes the vault's inode, size and
+        mtime, so any write to the vault or a restored snapshot misses.
+        """
+
+        if task.get("action_type") != "query_db":
+            return None
+
+        query = task.get("payload", {}).get("query")
+        if not isinstance(query, str) or query.lstrip()[:6].upper() != "SELECT":
+            return None
+
+        try:
+            stat = LOCAL_VAULT_DB.stat()
+        except OSError:
+            return None
+
+        return query, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    @classmethod
+    def _cached_result(cls, key: Tuple) -> Optional[Tuple]:
+        """Cached (success, result, error, execution_time), marked recently used."""
+
+        with cls._RESULT_CACHE_LOCK:
+            cached = cls._RESULT_CACHE.get(key)
+            if cached is not None:
+                cls._RESULT_CACHE.move_to_end(key)
+            return cached
+
+    @classmethod
+    def _store_result(cls, key: Tuple, execution: Tuple):
+        """Cache an execution, evicting the least recently used past the cap."""
+
+        with cls._RESULT_CACHE_LOCK:
+            cls._RESULT_CACHE[key] = execution
+            cls._RESULT_CACHE.move_to_end(key)
+            while len(cls._RESULT_CACHE) > cls._RESULT_CACHE_MAX:
+                cls._RESULT_CACHE.popitem(last=False)
+
+    @classmethod
+    def run_many(
+        cls,
+        tasks: List[Dict[str, Any]],
+        max_workers: int = 4,
+        **kwargs
+    ) -> List[Tuple[bool, int, Dict[str, Any]]]:
+        """
+        Run independent tasks' sandbox loops concurrently.
+
+        Sandbox work is file and SQLite I/O, which releases the GIL, so
+        threads overlap it; the default matches the sandbox pool size.
+        Each task's output is printed as one block when it finishes.
+
+        Args:
+            tasks: Tasks to test
+            max_workers: Concurrent orchestrations
+            **kwargs: max_iterations / target_score / verbose / use_cache for every task
+
+        Returns:
+            run() results, in task order
+        """
+
+        orchestrators = [cls(task, **kwargs) for task in tasks]
+        for orchestrator in orchestrators:
+            orchestrator._output = []
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="orchestrator") as pool:
+            futures = {pool.submit(o.run): o for o in orchestrators}
+            for future in as_completed(futures):
+                if futures[future]._output:
+                    print("\n".join(futures[future]._output))
+
+        return [future.result() for future in futures]
 
     def run(self) -> Tuple[bool, int, Dict[str, Any]]:
         """
@@ -35,95 +143,130 @@ class SandboxOrchestrator:
             Tuple of (success, final_score, results)
         """
 
-        print(f"=== Sandbox Orchestrator ===")
-        print(f"Task: {self.task.get('task_id')}")
-        print(f"Action: {self.task.get('action_type')}")
-        print(f"Target Score: {self.target_score}/100")
-        print(f"Max Iterations: {self.max_iterations}")
-        print()
+        self._print(f"=== Sandbox Orchestrator ===")
+        self._print(f"Task: {self.task.get('task_id')}")
+        self._print(f"Action: {self.task.get('action_type')}")
+        self._print(f"Target Score: {self.target_score}/100")
+        self._print(f"Max Iterations: {self.max_iterations}")
+        self._print()
 
-        current_task = self.task.copy()
+        # Never mutated: fixes come back as new task dicts
+        current_task = self.task
+        self.iteration_history.clear()
         best_score = 0
         best_result = None
-
-        for iteration in range(1, self.max_iterations + 1):
-            print(f"--- Iteration {iteration}/{self.max_iterations} ---")
-
-            # Execute in sandbox
-            executor = SandboxExecutor(current_task)
-
-            if not executor.create_environment():
-                print("✗ Failed to create sandbox environment")
-                break
-
-            start_time = time.time()
-            success, result, error = executor.execute_task(iteration)
-            execution_time = time.time() - start_time
-
-            # Calculate score
-            calculator = ScoreCalculator(current_task)
-            score, breakdown = calculator.calculate_score(
-                success,
-                result,
-                error,
-                execution_time
-            )
-
-            print(f"Execution: {'SUCCESS' if success else 'FAILED'}")
-            print(f"Score: {score}/100")
-            if error:
-                print(f"Error: {error}")
-
-            # Record iteration
-            iteration_record = {
-                "iteration": iteration,
-                "success": success,
-                "score": score,
-                "breakdown": breakdown,
-                "error": error,
-                "result": result,
-                "execution_time": execution_time
-            }
-            self.iteration_history.append(iteration_record)
-
-            # Track best result
-            if score > best_score:
-                best_score = score
-                best_result = iteration_record
-
-            # Cleanup sandbox
-            executor.cleanup(keep_on_failure=(not success))
-
-            # Check if target reached
-            if score >= self.target_score:
-                print(f"\n✓ Target score reached ({score} >= {self.target_score})")
-                return True, score, best_result
-
-            # Try to generate fix if not last iteration
-            if iteration < self.max_iterations and not success:
-                print(f"\nGenerating fix for iteration {iteration + 1}...")
-                generator = FixGenerator(current_task)
-                fixed_task = generator.generate_fix(error, iteration, self.iteration_history)
-
-                if fixed_task:
-                    current_task = fixed_task
-                    print(f"✓ Fix applied: {fixed_task['fix_metadata']['fix_type']}")
+        # (error, fix type) pairs already tried; sandboxes start from the same
+        # vault copy, so the same fix for the same error cannot do better
+        tried_fixes = set()
+
+        executor = None
+        success = False
+        try:
+            for iteration in range(1, self.max_iterations + 1):
+                self._print(f"--- Iteration {iteration}/{self.max_iterations} ---")
+
+                cache_key = self._result_key(current_task) if self.use_cache else None
+                cached = self._cached_result(cache_key) if cache_key is not None else None
+
+                if cached is not None:
+                    # Same query against the same vault: no sandbox needed
+                    success, result, error, execution_time = cached
+                    self._print("(cached sandbox result)")
                 else:
-                    print("✗ No fix available - task unfixable")
+                    # Execute in sandbox, reusing the first iteration's environment
+                    if executor is None:
+                        executor = SandboxExecutor(current_task)
+                        if not executor.create_environment():
+                            executor = None
+                            self._print("✗ Failed to create sandbox environment")
+                            break
+                    elif not executor.reset_task(current_task):
+                        self._print("✗ Failed to reset sandbox environment")
+                        break
+
+                    start_time = time.time()
+                    success, result, error = executor.execute_task(iteration)
+                    execution_time = time.time() - start_time
+
+                    # Failures may be transient (locked or unreadable vault),
+                    # so only successes are replayed
+                    if cache_key is not None and success:
+                        self._store_result(cache_key, (success, result, error, execution_time))
+
+                # Rows are shared with the cache; hand out a copy of the list
+                if isinstance(result, list):
+                    result = list(result)
+
+                # Calculate score
+                calculator = ScoreCalculator(current_task)
+                score, breakdown = calculator.calculate_score(
+                    success,
+                    result,
+                    error,
+                    execution_time
+                )
+
+                self._print(f"Execution: {'SUCCESS' if success else 'FAILED'}")
+                self._print(f"Score: {score}/100")
+                if error:
+                    self._print(f"Error: {error}")
+
+                # Record iteration
+                iteration_record = {
+                    "iteration": iteration,
+                    "success": success,
+                    "score": score,
+                    "breakdown": breakdown,
+                    "error": error,
+                    "result": result,
+                    "execution_time": execution_time
+                }
+                self.iteration_history.append(iteration_record)
+
+                # Track best result
+                if score > best_score:
+                    best_score = score
+                    best_result = iteration_record
+
+                # Check if target reached
+                if score >= self.target_score:
+                    self._print(f"\n✓ Target score reached ({score} >= {self.target_score})")
+                    return True, score, best_result
+
+                # Try to generate fix if not last iteration
+                if iteration < self.max_iterations and not success:
+                    self._print(f"\nGenerating fix for iteration {iteration + 1}...")
+                    generator = FixGenerator(current_task)
+                    fixed_task = generator.generate_fix(error, iteration, self.iteration_history)
+
+                    if fixed_task:
+                        fix_type = fixed_task["fix_metadata"]["fix_type"]
+                        if (error, fix_type) in tried_fixes:
+                            self._print(f"✗ Fix {fix_type} already tried for this error - giving up")
+                            break
+                        tried_fixes.add((error, fix_type))
+
+                        current_task = fixed_task
+                        self._print(f"✓ Fix applied: {fixed_task['fix_metadata']['fix_type']}")
+                    else:
+                        self._print("✗ No fix available - task unfixable")
+                        break
+                elif iteration < self.max_iterations:
+                    # Success but score below target - harder to fix
+                    self._print(f"\n⚠ Task succeeded but score {score} below target {self.target_score}")
+                    self._print("  (Difficult to improve without more context)")
                     break
-            elif iteration < self.max_iterations:
-                # Success but score below target - harder to fix
-                print(f"\n⚠ Task succeeded but score {score} below target {self.target_score}")
-                print("  (Difficult to improve without more context)")
-                break
 
-            print()
+                self._print()
+        finally:
+            if executor is not None:
+                executor.cleanup(keep_on_failure=(not success))
 
         # Final result
-        print(f"=== Final Result ===")
-        print(f"Best Score: {best_score}/100")
-        print(f"Iterations: {len(self.iteration_history)}")
-        print(f"Target Reached: {'YES' if best_score >= self.target_score else 'NO'}")
+        self._print(f"=== Final Result ===")
+        self._print(f"Best Score: {best_score}/100")
+        self._print(f"Iterations: {len(self.iteration_history)}")
+        self._print(f"Target Reached: {'YES' if best_score >= self.target_score else 'NO'}")
 
         return best_score >= self.target_score, best_score, best_result
 
@@ -192,6 +335,19 @@ if __name__ == "__main__":
     print(f"\n{'✓' if not success3 else '✗'} Test 3: {'PASS (correctly failed)' if not success3 else 'FAIL (should have failed)'}")
     print()
 
+    # Test 4: The same three tasks run concurrently
+    print("=" * 60)
+    print("TEST 4: Concurrent run_many")
+    print("=" * 60)
+
+    results4 = SandboxOrchestrator.run_many(
+        [test_task_1, test_task_2, test_task_3], max_iterations=3, target_score=95
+    )
+    success4 = [r[0] for r in results4] == [True, True, False]
+
+    print(f"\n{'✓' if success4 else '✗'} Test 4: {'PASS' if success4 else 'FAIL'}")
+    print()
+
     # Summary
     print("=" * 60)
     print("SUMMARY")
@@ -199,8 +355,9 @@ if __name__ == "__main__":
     print(f"Test 1 (Success): {'✓ PASS' if success else '✗ FAIL'}")
     print(f"Test 2 (Fixable): {'✓ PASS' if success2 else '✗ FAIL'}")
     print(f"Test 3 (Unfixable): {'✓ PASS' if not success3 else '✗ FAIL'}")
+    print(f"Test 4 (Concurrent): {'✓ PASS' if success4 else '✗ FAIL'}")
 
-    all_passed = success and success2 and not success3
+    all_passed = success and success2 and not success3 and success4
     print(f"\nOverall: {'✓ ALL PASS' if all_passed else '✗ SOME FAILED'}")
 
     sys.exit(0 if all_passed else 1)
@@ -4,10 +4,55 @@ Autonomous System - Score Calculator
 Calculates validation score (0-100) for sandbox task execution.
 """
 
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Callable, List, Tuple
 from pathlib import Path
 import json
 
+try:
+    # Vectorized batch scoring (pip install numpy)
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _score_integer_output(result: Any) -> int:
+    """
+    Integer expected: a plain int, or a DB query result shaped [(count,)].
+
+    Results are built-ins straight from sqlite3/json, so exact type checks
+    stand in for isinstance; bool still counts as int, as it did there.
+    """
+
+    result_type = type(result)
+    if result_type is int or result_type is bool:
+        return 100
+    if (result_type is list or result_type is tuple) and result:
+        # DB query result: [(count,)]
+        row = result[0]
+        row_type = type(row)
+        if (row_type is tuple or row_type is list) and row:
+            value_type = type(row[0])
+            if value_type is int or value_type is bool:
+                return 100
+        return 70
+    return 40
+
+
+def _type_scorer(expected: type) -> Callable[[Any], int]:
+    """Full marks for an instance of expected, half otherwise."""
+
+    return lambda result: 100 if isinstance(result, expected) else 50
+
+
+# expected_result -> output validity scorer
+_OUTPUT_VALIDATORS: Dict[str, Callable[[Any], int]] = {
+    "integer": _score_integer_output,
+    "list": _type_scorer(list),
+    "dict": _type_scorer(dict),
+    "string": _type_scorer(str),
+    "boolean": _type_scorer(bool),
+}
+
 
 class ScoreCalculator:
     """Calculates comprehensive score for task execution."""
@@ -20,6 +65,30 @@ class ScoreCalculator:
         "performance": 10           # Execution time within bounds
     }
 
+    # Weights as fractions, baked once for the total score expression
+    _W_EXECUTION_SUCCESS = WEIGHTS["execution_success"] / 100
+    _W_OUTPUT_VALIDITY = WEIGHTS["output_validity"] / 100
+    _W_SIDE_EFFECTS_CLEAN = WEIGHTS["side_effects_clean"] / 100
+    _W_PERFORMANCE = WEIGHTS["performance"] / 100
+
+    # Expected time limits by action type (seconds)
+    TIME_LIMITS = {
+        "query_db": 1.0,
+        "update_db": 2.0,
+        "read_file": 0.5,
+        "write_file": 1.0,
+        "execute_script": 10.0,
+        "system_optimization": 30.0
+    }
+    DEFAULT_TIME_LIMIT = 5.0
+
+    # (limit, 2x, 5x) performance band edges per action type, built once
+    _PERFORMANCE_BANDS = {
+        action_type: (limit, limit * 2, limit * 5)
+        for action_type, limit in TIME_LIMITS.items()
+    }
+    _DEFAULT_PERFORMANCE_BANDS = (DEFAULT_TIME_LIMIT, DEFAULT_TIME_LIMIT * 2, DEFAULT_TIME_LIMIT * 5)
+
     def __init__(self, task: Dict[str, Any]):
         self.task = task
         self.action_type = task.get("action_type")
@@ -54,10 +123,11 @@ class ScoreCalculator:
         if success:
             breakdown["execution_success"] = 100
         else:
-            # Partial credit for known/recoverable errors
-            if error and "syntax" in error.lower():
+            # Partial credit for known/recoverable errors (lowercased once)
+            error_lower = error.lower() if error else ""
+            if "syntax" in error_lower:
                 breakdown["execution_success"] = 20  # Syntax error - easily fixable
-            elif error and "permission" in error.lower():
+            elif "permission" in error_lower:
                 breakdown["execution_success"] = 0   # Permission error - not fixable
             else:
                 breakdown["execution_success"] = 30  # Other errors - might be fixable
@@ -72,9 +142,11 @@ class ScoreCalculator:
         breakdown["performance"] = self._score_performance(execution_time)
 
         # Calculate weighted total
-        total_score = sum(
-            breakdown[component] * self.WEIGHTS[component] / 100
-            for component in self.WEIGHTS
+        total_score = (
+            breakdown["execution_success"] * self._W_EXECUTION_SUCCESS
+            + breakdown["output_validity"] * self._W_OUTPUT_VALIDITY
+            + breakdown["side_effects_clean"] * self._W_SIDE_EFFECTS_CLEAN
+            + breakdown["performance"] * self._W_PERFORMANCE
         )
 
         return int(total_score), breakdown
@@ -89,42 +161,15 @@ class ScoreCalculator:
 
         # No expectation defined - assume valid if no error
         if not expected_type:
-            return result is not None and 80 or 60
+            return 80 if result is not None else 60
 
         # Check type matching
-        if expected_type == "integer":
-            if isinstance(result, int):
-                return 100
-            elif isinstance(result, (list, tuple)) and len(result) > 0:
-                # DB query result: [(count,)]
-                if isinstance(result[0], (list, tuple)) and len(result[0]) > 0:
-                    if isinstance(result[0][0], int):
-                        return 100
-                return 70
-            return 40
-
-        elif expected_type == "list":
-            if isinstance(result, list):
-                return 100
-            return 50
-
-        elif expected_type == "dict":
-            if isinstance(result, dict):
-                return 100
-            return 50
-
-        elif expected_type == "string":
-            if isinstance(result, str):
-                return 100
-            return 50
-
-        elif expected_type == "boolean":
-            if isinstance(result, bool):
-                return 100
-            return 50
+        validator = _OUTPUT_VALIDATORS.get(expected_type) if isinstance(expected_type, str) else None
+        if validator is None:
+            # Unknown expected type
+            return 70
 
-        # Unknown expected type
-        return 70
+        return validator(result)
 
     def _score_side_effects(self, side_effects: Dict[str, Any]) -> int:
         """Score side effects cleanliness."""
@@ -160,23 +205,15 @@ class ScoreCalculator:
     def _score_performance(self, execution_time: float) -> int:
         """Score performance based on execution time."""
 
-        # Expected time limits by action type
-        time_limits = {
-            "query_db": 1.0,        # 1 second
-            "update_db": 2.0,       # 2 seconds
-            "read_file": 0.5,       # 0.5 seconds
-            "write_file": 1.0,      # 1 second
-            "execute_script": 10.0, # 10 seconds
-            "system_optimization": 30.0  # 30 seconds
-        }
-
-        limit = time_limits.get(self.action_type, 5.0)
+        limit, limit_2x, limit_5x = self._PERFORMANCE_BANDS.get(
+            self.action_type, self._DEFAULT_PERFORMANCE_BANDS
+        )
 
         if execution_time <= limit:
             return 100
-        elif execution_time <= limit * 2:
+        elif execution_time <= limit_2x:
             return 70
-        elif execution_time <= limit * 5:
+        elif execution_time <= limit_5x:
             return 40
         else:
             return 10
@@ -216,6 +253,77 @@ class ScoreCalculator:
         return "\n".join(lines)
 
 
+def calculate_scores(executions: List[Dict[str, Any]]) -> List[int]:
+    """
+    Score many task executions at once; same totals as calculate_score.
+
+    With numpy installed the execution and performance components and the
+    weighting run as array operations over the whole batch; output and
+    side-effect checks inspect Python objects and stay per row. Otherwise
+    executions are scored one by one.
+
+    Args:
+        executions: Dicts with the task plus calculate_score's arguments
+            (success, result, error, execution_time, side_effects)
+
+    Returns:
+        List of scores, in execution order
+    """
+
+    if np is None:
+        return [
+            ScoreCalculator(e["task"]).calculate_score(
+                e["success"], e.get("result"), e.get("error"),
+                e["execution_time"], e.get("side_effects")
+            )[0]
+            for e in executions
+        ]
+
+    count = len(executions)
+    calculators = [ScoreCalculator(e["task"]) for e in executions]
+
+    successes = np.fromiter((bool(e["success"]) for e in executions), dtype=bool, count=count)
+    errors = [(e.get("error") or "").lower() for e in executions]
+    syntax = np.fromiter(("syntax" in error for error in errors), dtype=bool, count=count)
+    permission = np.fromiter(("permission" in error for error in errors), dtype=bool, count=count)
+    execution = np.where(successes, 100.0, np.where(syntax, 20.0, np.where(permission, 0.0, 30.0)))
+
+    output = np.fromiter(
+        (c._score_output_validity(e["success"], e.get("result")) for c, e in zip(calculators, executions)),
+        dtype=np.float64,
+        count=count
+    )
+    side_effects = np.fromiter(
+        (c._score_side_effects(e.get("side_effects") or {}) for c, e in zip(calculators, executions)),
+        dtype=np.float64,
+        count=count
+    )
+
+    times = np.fromiter((e["execution_time"] for e in executions), dtype=np.float64, count=count)
+    bands = np.array(
+        [
+            ScoreCalculator._PERFORMANCE_BANDS.get(c.action_type, ScoreCalculator._DEFAULT_PERFORMANCE_BANDS)
+            for c in calculators
+        ],
+        dtype=np.float64
+    ).reshape(count, 3)
+    performance = np.select(
+        [times <= bands[:, 0], times <= bands[:, 1], times <= bands[:, 2]],
+        [100.0, 70.0, 40.0],
+        10.0
+    )
+
+    # Same operation order as calculate_score, so float totals match exactly
+    total = (
+        execution * ScoreCalculator._W_EXECUTION_SUCCESS
+        + output * ScoreCalculator._W_OUTPUT_VALIDITY
+        + side_effects * ScoreCalculator._W_SIDE_EFFECTS_CLEAN
+        + performance * ScoreCalculator._W_PERFORMANCE
+    )
+
+    return total.astype(np.int64).tolist()
+
+
 # Test cases
 def run_tests():
     """Test score calculator with various scenarios."""
@@ -249,6 +357,19 @@ def run_tests():
             "execution_time": 1.5,  # Slightly over limit
             "expected_score_min": 85
         },
+        {
+            "name": "Falsy Result (No Expectation)",
+            "task": {
+                "action_type": "query_db",
+                "payload": {}
+            },
+            "success": True,
+            "result": 0,  # Still a result: 80 validity, not the 60 for None
+            "error": "",
+            "execution_time": 0.1,
+            "expected_score_min": 90,
+            "expected_score_max": 95
+        },
         {
             "name": "Syntax Error",
             "task": {
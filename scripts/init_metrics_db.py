@@ -4,115 +4,141 @@ Autonomous System - Metrics Database Initializer
 Creates SQLite database for tracking execution metrics, system health, and notifications.
 """
 
+import hashlib
 import sqlite3
-import os
+import sys
 from pathlib import Path
-from datetime import datetime
 
-DB_PATH = Path.home() / ".claude" / "autonomous" / "metrics.db"
+sys.path.insert(0, str(Path(__file__).parent.parent / "common"))
 
+from db import open_db, ensure_metrics_indexes, ensure_metrics_rollups, ROLLBACK_EVENTS_TABLE, METRICS_DB_OPTIONS
 
-def init_database():
-    """Initialize metrics database with required tables."""
+DB_PATH = Path.home() / ".claude" / "autonomous" / "metrics.db"
 
-    # Ensure parent directory exists
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
+# Tables and indexes, created in one transaction (one commit, not one per
+# statement). IMMEDIATE takes the write lock up front, so a heartbeat commit
+# mid-script makes it wait out busy_timeout instead of failing with a stale
+# snapshot. Covering indexes and the hourly rollup are added separately
+METRICS_SCHEMA = f"""
+    BEGIN IMMEDIATE;
+
+    -- Execution metrics table
+    CREATE TABLE IF NOT EXISTS execution_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id TEXT NOT NULL,
+        task_type TEXT NOT NULL,
+        risk_level TEXT NOT NULL,
+        risk_score INTEGER NOT NULL,
+        sandbox_score INTEGER,
+        status TEXT NOT NULL,
+        execution_time_seconds REAL,
+        iterations_count INTEGER DEFAULT 1,
+        error_message TEXT,
+        snapshot_id TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP
+    );
+
+    -- System health table
+    CREATE TABLE IF NOT EXISTS system_health (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        heartbeat_cycle_id TEXT NOT NULL,
+        tasks_discovered INTEGER DEFAULT 0,
+        tasks_executed INTEGER DEFAULT 0,
+        tasks_failed INTEGER DEFAULT 0,
+        tasks_escalated INTEGER DEFAULT 0,
+        avg_risk_score REAL,
+        cycle_duration_seconds REAL,
+        status TEXT NOT NULL,
+        error_details TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- User notifications table
+    CREATE TABLE IF NOT EXISTS user_notifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        notification_type TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        title TEXT NOT NULL,
+        message TEXT NOT NULL,
+        task_id TEXT,
+        delivered BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        delivered_at TIMESTAMP
+    );
+
+    -- Memory context table (for MEMORY.md sync). Only ever addressed by
+    -- (category, key), so that key is the table's storage order
+    CREATE TABLE IF NOT EXISTS memory_context (
+        category TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (category, key)
+    ) WITHOUT ROWID;
+
+    -- Rollback events table (replaces logs/rollbacks.log)
+    {ROLLBACK_EVENTS_TABLE};
+
+    -- Create indexes for common queries
+    CREATE INDEX IF NOT EXISTS idx_execution_created
+    ON execution_metrics(created_at DESC);
+
+    CREATE INDEX IF NOT EXISTS idx_execution_status
+    ON execution_metrics(status);
+
+    CREATE INDEX IF NOT EXISTS idx_health_created
+    ON system_health(created_at DESC);
+
+    -- Only the pending set: the notifier logs rows already delivered,
+    -- so most inserts skip this index entirely
+    DROP INDEX IF EXISTS idx_notifications_undelivered;
+    CREATE INDEX IF NOT EXISTS idx_notifications_pending
+    ON user_notifications(created_at) WHERE delivered = 0;
+
+    COMMIT;
+"""
 
-    # Execution metrics table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS execution_metrics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id TEXT NOT NULL,
-            task_type TEXT NOT NULL,
-            risk_level TEXT NOT NULL,
-            risk_score INTEGER NOT NULL,
-            sandbox_score INTEGER,
-            status TEXT NOT NULL,
-            execution_time_seconds REAL,
-            iterations_count INTEGER DEFAULT 1,
-            error_message TEXT,
-            snapshot_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            completed_at TIMESTAMP
-        )
-    """)
+# Fingerprint of METRICS_SCHEMA kept in PRAGMA user_version (positive 31-bit,
+# never the default 0), so init can skip the script once it has been applied
+METRICS_SCHEMA_VERSION = (
+    int.from_bytes(hashlib.sha1(METRICS_SCHEMA.encode("utf-8")).digest()[:4], "big") & 0x7FFFFFFF
+) or 1
 
-    # System health table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS system_health (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            heartbeat_cycle_id TEXT NOT NULL,
-            tasks_discovered INTEGER DEFAULT 0,
-            tasks_executed INTEGER DEFAULT 0,
-            tasks_failed INTEGER DEFAULT 0,
-            tasks_escalated INTEGER DEFAULT 0,
-            avg_risk_score REAL,
-            cycle_duration_seconds REAL,
-            status TEXT NOT NULL,
-            error_details TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
 
-    # User notifications table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_notifications (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            notification_type TEXT NOT NULL,
-            severity TEXT NOT NULL,
-            title TEXT NOT NULL,
-            message TEXT NOT NULL,
-            task_id TEXT,
-            delivered BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            delivered_at TIMESTAMP
-        )
-    """)
+def init_database():
+    """Initialize metrics database with required tables."""
 
-    # Memory context table (for MEMORY.md sync)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS memory_context (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            category TEXT NOT NULL,
-            key TEXT NOT NULL,
-            value TEXT NOT NULL,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(category, key)
-        )
-    """)
+    # Ensure parent directory exists
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    # Create indexes for common queries
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_execution_created
-        ON execution_metrics(created_at DESC)
-    """)
+    # WAL from the first write: heartbeat cycles insert while dashboards read.
+    # journal_mode persists, so metrics.db-wal/-shm belong to the database
+    # (mmap/cache also speed up ANALYZE and the rollup backfill on existing data)
+    # Wait up to 30s (sqlite3's default is 5s) for a heartbeat holding the write lock
+    conn = open_db(DB_PATH, timeout=30, **METRICS_DB_OPTIONS)
 
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_execution_status
-        ON execution_metrics(status)
-    """)
+    # Tables and indexes only when this exact schema has not been applied yet
+    if conn.execute("PRAGMA user_version").fetchone()[0] != METRICS_SCHEMA_VERSION:
+        conn.executescript(METRICS_SCHEMA)
+        conn.execute(f"PRAGMA user_version={METRICS_SCHEMA_VERSION}")
 
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_health_created
-        ON system_health(created_at DESC)
-    """)
+    # Covering indexes shared with the dashboards (commits if it adds any)
+    ensure_metrics_indexes(conn)
 
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_notifications_undelivered
-        ON user_notifications(delivered, created_at DESC)
-    """)
+    # Hourly rollup for dashboard windows (runs its own transaction)
+    ensure_metrics_rollups(conn)
 
-    conn.commit()
     conn.close()
 
-    print(f"✓ Metrics database initialized: {DB_PATH}")
+    print(f"✓ Metrics database initialized: {DB_PATH} (WAL)")
     print(f"  - execution_metrics table created")
     print(f"  - system_health table created")
     print(f"  - user_notifications table created")
     print(f"  - memory_context table created")
+    print(f"  - rollback_events table created")
+    print(f"  - hourly_metrics rollup created")
     print(f"  - Indexes created")
 
 
@@ -135,7 +161,9 @@ def verify_database():
     tables = [row[0] for row in cursor.fetchall()]
     expected_tables = [
         'execution_metrics',
+        'hourly_metrics',
         'memory_context',
+        'rollback_events',
         'system_health',
         'user_notifications'
     ]
@@ -146,11 +174,28 @@ def verify_database():
         conn.close()
         return False
 
+    # Row counts recorded by the last ANALYZE (first stat field), so large
+    # tables are not scanned; COUNT(*) only for tables it has not seen
+    estimates = {}
+    if "sqlite_stat1" in tables:
+        for table, stat in cursor.execute("SELECT tbl, stat FROM sqlite_stat1"):
+            estimates[table] = max(estimates.get(table, 0), int(stat.split()[0]))
+
+    # Exact counts for the rest in one statement; names come from
+    # sqlite_master, quoted as identifiers
+    to_count = [table for table in tables if table not in estimates]
+    counts = {}
+    if to_count:
+        counts = dict(cursor.execute(" UNION ALL ".join(
+            "SELECT ?, COUNT(*) FROM \"{}\"".format(table.replace('"', '""')) for table in to_count
+        ), to_count))
+
     print(f"✓ Database structure verified")
     for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        count = cursor.fetchone()[0]
-        print(f"  - {table}: {count} rows")
+        if table in estimates:
+            print(f"  - {table}: ~{estimates[table]} rows (as of last ANALYZE)")
+        else:
+            print(f"  - {table}: {counts[table]} rows")
 
     conn.close()
     return True